@@ -1,15 +1,28 @@
 import tkinter as tk
-from tkinter import filedialog, messagebox, scrolledtext
-import networkx as nx
-import re
+from tkinter import filedialog, messagebox, scrolledtext, ttk
 import os
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import graphviz
 import random
-from collections import defaultdict
 random.seed(42)
-import numpy as np
+# numpy、graphviz 等重量级模块由 graph_engine / graph_render 在首次用到时导入
+import graph_engine as ge
+import graph_jobs as gj
+import graph_render as gr
+
+PREVIEW_CHARS = 64 * 1024  # 文本区域最多显示的字符数
+MAX_SHOWN_PATHS = 50       # 最多列出并高亮的最短路径条数
+CACHE_DIR = ".graph_cache"  # 全源最短路径表与布局坐标的缓存目录
+PAGERANK_TOP = 10           # 批量计算 PageRank 时每组配置显示的单词数
+SHIFT_MASK = 0x0001         # 事件 state 中表示按住 Shift 的位
+INFO_PAGE = 200             # 图结构信息表每次追加的行数
+CONFIRM_TABLE_BYTES = 256 << 20  # 全源最短路径表超过这么大时先询问用户
+
+# 图结构信息表：类型 -> (列标题, {排序方式: 显示名称})
+INFO_KINDS = {
+    "节点": (("单词", "出度", "入度"),
+             {'name': "名称", 'degree': "总度数", 'out': "出度", 'in': "入度"}),
+    "边": (("源节点", "目标节点", "权重"),
+           {'weight': "权重", 'name': "名称"}),
+}
 
 
 class TextGraphApp:
@@ -20,6 +33,12 @@ class TextGraphApp:
         
         # 存储图结构
         self.graph = None
+        self.bridge_index = None
+        self.distance_table = None
+        self.pagerank_cache = ge.PageRankCache()
+        self.layout_cache = gr.LayoutCache(os.path.join(CACHE_DIR, "layout"))
+        self.layout_view = None
+        self.render_worker = gr.RenderWorker(root)
         
         # 创建界面组件
         self.create_widgets()
@@ -27,6 +46,7 @@ class TextGraphApp:
         self.create_new_text_processing_ui()
         self.create_shortest_path_ui()
         self.create_pagerank_ui()
+        self.jobs = gj.JobRunner(root, self.status_var, self.cancel_btn)
 
     def create_widgets(self):
         # 顶部控制区域
@@ -66,8 +86,41 @@ class TextGraphApp:
         graph_info_label = tk.Label(left_frame, text="图结构信息:")
         graph_info_label.pack(anchor=tk.W, pady=(10, 0))
         
-        self.graph_info = scrolledtext.ScrolledText(left_frame, wrap=tk.WORD, height=15)
-        self.graph_info.pack(fill=tk.X, expand=True)
+        self.graph_summary = tk.Label(left_frame, text="", justify=tk.LEFT, anchor=tk.W,
+                                      font=("Courier", 9))
+        self.graph_summary.pack(fill=tk.X)
+
+        # 节点/边列表：只插入看得到的行，滚动到底部时再追加下一页
+        info_bar = tk.Frame(left_frame)
+        info_bar.pack(fill=tk.X, pady=2)
+        self.info_kind = ttk.Combobox(info_bar, values=list(INFO_KINDS), state="readonly", width=5)
+        self.info_kind.current(0)
+        self.info_kind.bind("<<ComboboxSelected>>", self.on_info_kind)
+        self.info_kind.pack(side=tk.LEFT)
+        tk.Label(info_bar, text="排序:").pack(side=tk.LEFT, padx=(5, 0))
+        self.info_sort = ttk.Combobox(info_bar, state="readonly", width=8)
+        self.info_sort.bind("<<ComboboxSelected>>", self.reload_graph_info)
+        self.info_sort.pack(side=tk.LEFT)
+        tk.Label(info_bar, text="搜索:").pack(side=tk.LEFT, padx=(5, 0))
+        self.info_search = tk.Entry(info_bar, width=12)
+        self.info_search.bind("<KeyRelease>", self.on_info_search)
+        self.info_search.pack(side=tk.LEFT)
+        self.info_count = tk.Label(info_bar, text="")
+        self.info_count.pack(side=tk.LEFT, padx=5)
+
+        tree_frame = tk.Frame(left_frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True)
+        self.info_tree = ttk.Treeview(tree_frame, columns=("c0", "c1", "c2"), show="headings", height=12)
+        self.info_scroll = tk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.info_tree.yview)
+        self.info_tree.configure(yscrollcommand=self.on_info_scroll)
+        self.info_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.info_tree.pack(fill=tk.BOTH, expand=True)
+        self.graph_listing = None
+        self.info_rows = []
+        self.info_loaded = 0
+        self.info_after = None
+        self.info_loading = False
+        self.on_info_kind()
         
         # 右侧：图形展示区域
         right_frame = tk.Frame(content_frame, width=800)
@@ -85,20 +138,55 @@ class TextGraphApp:
         layout_options = ["dot", "neato", "fdp", "sfdp", "twopi", "circo"]
         layout_menu = tk.OptionMenu(graph_control_frame, self.layout_var, *layout_options)
         layout_menu.pack(side=tk.LEFT, padx=5)
+
+        # 细节层次：大图只绘制部分节点，查询仍使用完整的图
+        tk.Label(graph_control_frame, text="显示:").pack(side=tk.LEFT, padx=5)
+        self.lod_var = tk.StringVar(value=gr.LOD_MODES['full'])
+        lod_menu = tk.OptionMenu(graph_control_frame, self.lod_var, *gr.LOD_MODES.values())
+        lod_menu.pack(side=tk.LEFT)
+        tk.Label(graph_control_frame, text="K:").pack(side=tk.LEFT)
+        self.lod_k = tk.Spinbox(graph_control_frame, from_=10, to=gr.MAX_RENDER_NODES,
+                                increment=10, width=5)
+        self.lod_k.delete(0, tk.END)
+        self.lod_k.insert(0, "100")
+        self.lod_k.pack(side=tk.LEFT)
+        tk.Label(graph_control_frame, text="最小权重:").pack(side=tk.LEFT)
+        self.lod_weight = tk.Spinbox(graph_control_frame, from_=1, to=1000, width=4)
+        self.lod_weight.pack(side=tk.LEFT)
+        tk.Label(graph_control_frame, text="邻域步数:").pack(side=tk.LEFT)
+        self.lod_radius = tk.Spinbox(graph_control_frame, from_=1, to=5, width=3)
+        self.lod_radius.pack(side=tk.LEFT)
         
         # 刷新图形按钮
         refresh_btn = tk.Button(graph_control_frame, text="刷新图形", command=self.refresh_graph)
         refresh_btn.pack(side=tk.RIGHT, padx=5)
         
-        # 图形展示区域
+        # 图形展示区域：按布局坐标直接在画布上绘制，可滚动查看
         self.graph_frame = tk.Frame(right_frame, bg='white')
         self.graph_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # 底部状态栏
+        self.graph_canvas = tk.Canvas(self.graph_frame, bg='white')
+        x_scroll = tk.Scrollbar(self.graph_frame, orient=tk.HORIZONTAL, command=self.graph_canvas.xview)
+        y_scroll = tk.Scrollbar(self.graph_frame, orient=tk.VERTICAL, command=self.graph_canvas.yview)
+        self.graph_canvas.configure(xscrollcommand=x_scroll.set, yscrollcommand=y_scroll.set)
+        x_scroll.pack(side=tk.BOTTOM, fill=tk.X)
+        y_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.graph_canvas.pack(fill=tk.BOTH, expand=True)
+
+        # 点击节点填入查询单词（按住 Shift 填入第二个单词），悬停显示节点信息
+        self.hover_word = None
+        self.graph_canvas.bind("<ButtonRelease-1>", self.on_canvas_click)
+        self.graph_canvas.bind("<Motion>", self.on_canvas_hover)
+        self.graph_canvas.bind("<Leave>", self.on_canvas_leave)
+        
+        # 底部状态栏，后台任务的进度显示在这里
+        status_frame = tk.Frame(self.root)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        self.cancel_btn = tk.Button(status_frame, text="取消任务")
+        self.cancel_btn.pack(side=tk.RIGHT)
         self.status_var = tk.StringVar()
         self.status_var.set("准备就绪")
-        status_bar = tk.Label(self.root, textvariable=self.status_var, bd=1, relief=tk.SUNKEN, anchor=tk.W)
-        status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        status_bar = tk.Label(status_frame, textvariable=self.status_var, bd=1, relief=tk.SUNKEN, anchor=tk.W)
+        status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
 
 
     def create_bridge_words_ui(self):
@@ -142,6 +230,10 @@ class TextGraphApp:
                                         command=self.process_new_text, state=tk.DISABLED)
         self.process_text_btn.pack(side=tk.LEFT, padx=5)
 
+        self.append_text_btn = tk.Button(input_frame, text="追加到图",
+                                         command=self.append_new_text, state=tk.DISABLED)
+        self.append_text_btn.pack(side=tk.LEFT, padx=5)
+
         self.processed_text_result = scrolledtext.ScrolledText(new_text_frame, 
                                                               wrap=tk.WORD, height=4)
         self.processed_text_result.pack(fill=tk.X, pady=5)
@@ -169,6 +261,11 @@ class TextGraphApp:
                                         state=tk.DISABLED)
         self.shortest_path_btn.pack(side=tk.LEFT, padx=5)
 
+        self.precompute_btn = tk.Button(input_frame, text="预计算全部路径",
+                                        command=self.precompute_distances,
+                                        state=tk.DISABLED)
+        self.precompute_btn.pack(side=tk.LEFT, padx=5)
+
         # 使用ScrolledText支持滚动查看
         self.shortest_path_result = scrolledtext.ScrolledText(shortest_path_frame,
                                                             wrap=tk.WORD,
@@ -191,66 +288,86 @@ class TextGraphApp:
             self.shortest_path_result.insert(tk.END, f"错误：起点 '{start}' 不在图中")
             return
 
+        graph, table = self.graph, self.distance_table
+
         # 单节点模式
         if not end:
-            try:
-                paths = nx.single_source_dijkstra_path(self.graph, start, weight='weight')
-                lengths = nx.single_source_dijkstra_path_length(self.graph, start, weight='weight')
-            except nx.NetworkXException as e:
+            def work(job):
+                paths = ge.single_source_shortest_paths(graph, start, table=table,
+                                                        progress=gj.settled_progress(job))
+
+                # 格式化输出
+                result = []
+                for target in sorted(paths.keys()):
+                    length, path = paths[target]
+                    result.append(f"{start} → {target}:")
+                    result.append(f"   路径: {' → '.join(path)}")
+                    result.append(f"   长度: {length}\n")
+
+                # 处理不可达节点
+                unreachable = sorted(set(graph.nodes()) - set(paths.keys()) - {start})
+                if unreachable:
+                    result.append(f"\n不可达节点 ({len(unreachable)}):")
+                    result.append(", ".join(unreachable))
+                return "\n".join(result), None
+
+        else:
+            # 原双节点模式（保持原有逻辑）
+            if not graph.has_node(end):
                 self.shortest_path_result.delete(1.0, tk.END)
-                self.shortest_path_result.insert(tk.END, f"计算错误：{str(e)}")
+                self.shortest_path_result.insert(tk.END, f"错误：终点 '{end}' 不在图中")
                 return
 
-            # 格式化输出
-            result = []
-            for target in sorted(paths.keys()):
-                if target == start:
-                    continue
-                    
-                path = paths[target]
-                length = lengths[target]
-                result.append(f"{start} → {target}:")
-                result.append(f"   路径: {' → '.join(path)}")
-                result.append(f"   长度: {length}\n")
-            
-            # 处理不可达节点
-            unreachable = sorted(set(self.graph.nodes()) - set(paths.keys()) - {start})
-            if unreachable:
-                result.append(f"\n不可达节点 ({len(unreachable)}):")
-                result.append(", ".join(unreachable))
-            
-            self.shortest_path_result.delete(1.0, tk.END)
-            self.shortest_path_result.insert(tk.END, "\n".join(result))
-            self.shortest_paths = None
-            self.refresh_graph()
+            def work(job):
+                path_length, total, all_paths = ge.all_shortest_paths(
+                    graph, start, end, limit=MAX_SHOWN_PATHS, progress=gj.settled_progress(job))
+                if not all_paths:
+                    return f"{start} 到 {end} 不可达", None
+
+                path_texts = []
+                if total > len(all_paths):
+                    path_texts.append(f"共 {total} 条最短路径，仅显示前 {len(all_paths)} 条\n")
+                for idx, path in enumerate(all_paths, 1):
+                    path_str = " → ".join(path)
+                    path_texts.append(f"路径{idx}: {path_str} (长度: {path_length})")
+                return "\n".join(path_texts), all_paths
+
+        self.jobs.start("计算最短路径", work,
+                        lambda result: self.show_shortest_paths(graph, *result),
+                        widgets=(self.shortest_path_btn,))
+
+    def show_shortest_paths(self, graph, text, paths):
+        if graph is not self.graph:
+            # 计算期间重新生成了图时丢弃旧结果
             return
+        self.shortest_paths = paths
+        self.shortest_path_result.delete(1.0, tk.END)
+        self.shortest_path_result.insert(tk.END, text)
+        self.status_var.set("最短路径计算完成")
+        self.refresh_graph()
 
-        # 原双节点模式（保持原有逻辑）
-        if not self.graph.has_node(end):
-            self.shortest_path_result.delete(1.0, tk.END)
-            self.shortest_path_result.insert(tk.END, f"错误：终点 '{end}' 不在图中")
-            return
 
-        try:
-            path_length = nx.dijkstra_path_length(self.graph, start, end, weight='weight')
-            all_paths = list(nx.all_shortest_paths(self.graph, start, end, weight='weight'))
-        except nx.NetworkXNoPath:
-            self.shortest_path_result.delete(1.0, tk.END)
-            self.shortest_path_result.insert(tk.END, f"{start} 到 {end} 不可达")
-            self.shortest_paths = None
-            self.refresh_graph()
+    def precompute_distances(self):
+        """在后台线程中计算（或从缓存加载）全源最短路径表"""
+        graph = self.graph
+        size = ge.distance_table_bytes(graph)
+        if size > ge.MAX_TABLE_BYTES:
+            messagebox.showerror("错误", f"图太大：全源最短路径表需要 {size / 2 ** 20:.0f} MB")
             return
+        if size > CONFIRM_TABLE_BYTES and not messagebox.askyesno(
+                "确认", f"全源最短路径表需要约 {size / 2 ** 20:.0f} MB 内存与磁盘空间，是否继续？"):
+            return
+        self.jobs.start("预计算全部最短路径",
+                        lambda job: ge.distance_table(graph, cache_dir=CACHE_DIR,
+                                                      progress=gj.sources_progress(job)),
+                        lambda table: self.end_precompute(graph, table),
+                        widgets=(self.precompute_btn,))
 
-        self.shortest_paths = all_paths
-        
-        path_texts = []
-        for idx, path in enumerate(all_paths, 1):
-            path_str = " → ".join(path)
-            path_texts.append(f"路径{idx}: {path_str} (长度: {path_length})")
-        
-        self.shortest_path_result.delete(1.0, tk.END)
-        self.shortest_path_result.insert(tk.END, "\n".join(path_texts))
-        self.refresh_graph()
+    def end_precompute(self, graph, table):
+        if graph is self.graph:
+            # 计算期间重新生成了图时丢弃旧结果
+            self.distance_table = table
+            self.status_var.set("全部最短路径已预计算，单源查询将直接查表")
 
 
     def find_bridge_words(self):
@@ -285,34 +402,40 @@ class TextGraphApp:
 
 
     def generate_graph(self):
-        """根据文本生成有向图结构"""
+        """在后台线程中根据文本生成有向图结构"""
         if not self.file_path_var.get() or self.file_path_var.get() == "未选择文件":
             messagebox.showwarning("警告", "请先选择文本文件")
             return
-        
-        # 获取文本内容
-        text_content = self.text_display.get(1.0, tk.END)
-        
-        # 预处理文本
-        words = self.preprocess_text(text_content)
-        
-        if len(words) < 2:
+        path = self.file_path_var.get()
+
+        # 分块读取文件并直接创建有向图，不经过文本显示区域
+        def work(job):
+            graph = ge.build_graph_from_file(path, chunk_size=gj.CHUNK_SIZE,
+                                             progress=gj.words_progress(job))
+            index = ge.BridgeIndex(graph) if graph.number_of_edges() else None
+            return graph, index
+
+        self.jobs.start("生成图结构", work, self.end_generate,
+                        widgets=(self.file_btn, self.generate_btn),
+                        on_error=self.generate_failed)
+
+    def generate_failed(self, error):
+        messagebox.showerror("错误", f"无法读取文件: {str(error)}")
+        self.status_var.set("文件加载失败")
+
+    def end_generate(self, result):
+        graph, index = result
+        if graph.number_of_edges() == 0:
             messagebox.showwarning("警告", "文本内容太少，无法生成有效的图结构")
             self.status_var.set("文本内容不足")
             return
 
-        # 创建有向图
-        self.graph = nx.DiGraph()
-        
-        # 添加边和权重
-        for i in range(len(words) - 1):
-            word1 = words[i]
-            word2 = words[i + 1]
-            
-            if self.graph.has_edge(word1, word2):
-                self.graph[word1][word2]['weight'] += 1
-            else:
-                self.graph.add_edge(word1, word2, weight=1)
+        self.clear_view()
+        self.graph = graph
+        self.bridge_index = index
+        self.distance_table = None
+        self.pagerank = None
+        self.shortest_paths = None
         
         # 显示图结构信息
         self.display_graph_info()
@@ -325,77 +448,102 @@ class TextGraphApp:
 
         self.bridge_btn.config(state=tk.NORMAL)
         self.process_text_btn.config(state=tk.NORMAL)
+        self.append_text_btn.config(state=tk.NORMAL)
         self.shortest_path_btn.config(state=tk.NORMAL)
+        # 图太大时不提供全源最短路径表
+        too_large = ge.distance_table_bytes(graph) > ge.MAX_TABLE_BYTES
+        self.precompute_btn.config(state=tk.DISABLED if too_large else tk.NORMAL)
         self.pagerank_btn.config(state=tk.NORMAL)
 
 
+    def clear_view(self):
+        """换图时丢弃旧图的布局视图，新布局到达之前画布保持空白"""
+        self.render_worker.cancel()
+        self.layout_view = None
+        self.hover_word = None
+        self.graph_canvas.delete("all")
+
     def refresh_graph(self):
         if not self.graph:
             return
-        
-        # 清除现有图形
-        for widget in self.graph_frame.winfo_children():
-            widget.destroy()
-        
-        # 创建新的图形
-        dot = graphviz.Digraph(comment='Text Graph')
-        dot.attr(rankdir='LR')  # 从左到右的布局
-        
-        # 添加节点
-        if hasattr(self, 'pagerank') and self.pagerank is not None:
-            max_pr = max(self.pagerank.values()) or 1  # 防止除零
-            for node in self.graph.nodes():
-                pr = self.pagerank[node]
-                normalized = pr / max_pr
-                # 根据PR值设置节点大小和颜色
-                dot.node(node, 
-                        label=f"{node}\n{pr:.3f}",
-                        width=str(0.5 + normalized * 2),
-                        height=str(0.3 + normalized * 1),
-                        style='filled',
-                        fillcolor=f"{int(255*(1-normalized))},255,255")  # 颜色渐变
-        else:
-            for node in self.graph.nodes():
-                dot.node(node)
-
-        # 添加边
-        edge_colors = defaultdict(list)
-        if hasattr(self, 'shortest_paths') and self.shortest_paths is not None:
-            colors = ['#FF0000', '#0000FF', '#00FF00', '#FFA500', '#800080']
-            for path_idx, path in enumerate(self.shortest_paths):
-                color = colors[path_idx % len(colors)]
-                for i in range(len(path)-1):
-                    edge = (path[i], path[i+1])
-                    edge_colors[edge].append(color)
-        
-        for u, v, data in self.graph.edges(data=True):
-            edge = (u, v)
-            if edge in edge_colors:
-                color_str = ":".join(edge_colors[edge])
-                dot.edge(u, v, label=str(data['weight']), 
-                        color=color_str, penwidth='2.5', style='bold')
-            else:
-                dot.edge(u, v, label=str(data['weight']))
 
-        
-        # 设置布局引擎
-        dot.engine = self.layout_var.get()
-        
-        # 渲染图形
+        # 布局在后台线程计算，同一张图和布局引擎只布局一次
+        source, view, engine = self.graph, self.view_graph(), self.layout_var.get()
+        self.status_var.set("正在计算布局...")
+        self.render_worker.submit(
+            lambda stale: self.layout_cache.get(view, engine, rankdir='LR', stale=stale),
+            lambda layout: self.show_layout(source, view, layout),
+            self.render_failed)
+
+    def view_graph(self):
+        """按显示设置选出要绘制的子图"""
+        mode = next(m for m, label in gr.LOD_MODES.items() if label == self.lod_var.get())
         try:
-            # 保存图形文件
-            dot.render('temp_graph', format='png', cleanup=True)
-            
-            # 加载并显示图形
-            img = tk.PhotoImage(file='temp_graph.png')
-            img_label = tk.Label(self.graph_frame, image=img)
-            img_label.image = img  # 保持引用
-            img_label.pack(fill=tk.BOTH, expand=True)
-            
-            self.status_var.set("图形已更新")
-        except Exception as e:
-            messagebox.showerror("错误", f"无法生成图形: {str(e)}")
-            self.status_var.set("图形生成失败")
+            k, min_weight, radius = int(self.lod_k.get()), int(self.lod_weight.get()), int(self.lod_radius.get())
+        except ValueError:
+            k, min_weight, radius = 100, 1, 1
+        paths = getattr(self, 'shortest_paths', None) or []
+        path_words = {w for path in paths for w in path}
+        # 邻域以最短路径上的单词为中心，没有路径时使用输入框中的单词
+        centers = path_words or {e.get().lower().strip() for e in
+                                 (self.start_word_entry, self.word1_entry)} - {""}
+        return gr.level_of_detail(self.graph, mode, k, min_weight,
+                                  pagerank=getattr(self, 'pagerank', None),
+                                  centers=centers, radius=radius, keep=path_words)
+
+    def show_layout(self, source, graph, layout):
+        """在画布上绘制布局，之后只修改图元的样式"""
+        if source is not self.graph:
+            return
+        if self.layout_view is None or self.layout_view.layout is not layout:
+            self.layout_view = gr.LayoutView(self.graph_canvas, graph, layout)
+            self.layout_view.draw()
+            self.hover_word = None
+        self.layout_view.style(getattr(self, 'pagerank', None),
+                               getattr(self, 'shortest_paths', None))
+        shown = f"（显示 {len(graph)}/{len(source)} 个节点）" if graph is not source else ""
+        self.status_var.set("图形已更新" + shown)
+
+    def canvas_node(self, event):
+        """事件位置处的单词及其画布坐标，不在当前图中的单词视为 None"""
+        x, y = self.graph_canvas.canvasx(event.x), self.graph_canvas.canvasy(event.y)
+        if self.layout_view is None:
+            return None, x, y
+        word = self.layout_view.node_at(x, y)
+        return (word if word in self.graph else None), x, y
+
+    def on_canvas_click(self, event):
+        """点击的单词作为桥接词和最短路径的第一个单词，按住 Shift 时作为第二个"""
+        word, _, _ = self.canvas_node(event)
+        if word is None:
+            return
+        if event.state & SHIFT_MASK:
+            entries = (self.word2_entry, self.end_word_entry)
+        else:
+            entries = (self.word1_entry, self.start_word_entry)
+        for entry in entries:
+            entry.delete(0, tk.END)
+            entry.insert(0, word)
+        self.status_var.set(f"已选择单词: {word}")
+
+    def on_canvas_hover(self, event):
+        word, x, y = self.canvas_node(event)
+        if word == self.hover_word:
+            return
+        self.hover_word = word
+        if word is None:
+            gr.hide_tooltip(self.graph_canvas)
+        else:
+            gr.show_tooltip(self.graph_canvas, x, y,
+                            gr.node_info(self.graph, word, getattr(self, 'pagerank', None)))
+
+    def on_canvas_leave(self, event):
+        self.hover_word = None
+        gr.hide_tooltip(self.graph_canvas)
+
+    def render_failed(self, error):
+        messagebox.showerror("错误", f"无法生成图形: {str(error)}")
+        self.status_var.set("图形生成失败")
 
     def load_file(self):
         """选择并加载文本文件"""
@@ -408,10 +556,12 @@ class TextGraphApp:
             self.file_path_var.set(file_path)
             self.generate_btn.config(state=tk.NORMAL)
 
-            # 显示文件内容
+            # 只显示文件开头部分，完整内容在生成图结构时分块读取
             try:
                 with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                    content = f.read(PREVIEW_CHARS)
+                    if f.read(1):
+                        content += "\n\n……（仅显示文件开头部分）"
                     self.text_display.delete(1.0, tk.END)
                     self.text_display.insert(tk.END, content)
                 self.status_var.set(f"已加载文件: {os.path.basename(file_path)}")
@@ -421,67 +571,93 @@ class TextGraphApp:
     
     def preprocess_text(self, text):
         """预处理文本，提取单词"""
-        # 将文本转为小写并替换标点符号为空格
-        text = text.lower()
-        text = re.sub(r'[^\w\s]', ' ', text)
-        # 分割为单词列表
-        words = text.split()
-        return words
+        return ge.preprocess_text(text)
  
 
+    def append_new_text(self):
+        """把新文本的相邻单词作为边追加到现有图中"""
+        words = self.preprocess_text(self.new_text_entry.get())
+        if len(words) < 2:
+            messagebox.showwarning("警告", "新文本至少需要两个单词")
+            return
+
+        # 已有单词编号不变，PageRank以追加前的结果为初始向量
+        self.graph = ge.extend_graph(self.graph, words)
+        self.bridge_index = ge.BridgeIndex(self.graph)
+        self.distance_table = None
+        self.pagerank = None
+        self.display_graph_info()
+        self.refresh_graph()
+        self.status_var.set(f"已追加 {len(words) - 1} 条边")
+
     def process_new_text(self):
-        new_text = self.new_text_entry.get()
-        original_words = new_text.split()
-        processed_words = []
-
-        for i in range(len(original_words)):
-            processed_words.append(original_words[i])  # 保持原格式
-            
-            if i < len(original_words) - 1:
-                word1 = original_words[i].lower()
-                word2 = original_words[i+1].lower()
-                
-                bridge_words = self.find_bridge_words_for_pair(word1, word2)
-                
-                if bridge_words:
-                    selected = random.choice(bridge_words)
-                    processed_words.append(selected)
-        
-        new_text = ' '.join(processed_words)
+        new_text = ge.insert_bridge_words(self.graph, self.new_text_entry.get(),
+                                          index=self.bridge_index)
         self.processed_text_result.delete(1.0, tk.END)
         self.processed_text_result.insert(tk.END, new_text)
 
     def find_bridge_words_for_pair(self, word1, word2):
-        if not self.graph.has_node(word1) or not self.graph.has_node(word2):
-            return []
-        
-        bridges = []
-        for successor in self.graph.successors(word1):
-            if self.graph.has_edge(successor, word2):
-                bridges.append(successor)
-        return bridges
+        return self.bridge_index.lookup(word1, word2)
 
 
     def display_graph_info(self):
-        """显示图结构的基本信息"""
+        """显示图结构的基本信息，节点和边列表按需加载"""
         if not self.graph:
             return
-        
-        self.graph_info.delete(1.0, tk.END)
-        
-        info_text = "图结构信息:\n\n"
-        info_text += f"节点数量: {self.graph.number_of_nodes()}\n"
-        info_text += f"边数量: {self.graph.number_of_edges()}\n\n"
-        
-        info_text += "节点列表:\n"
-        for node in sorted(self.graph.nodes()):
-            info_text += f"- {node}\n"
-        
-        info_text += "\n边列表 (源节点 -> 目标节点: 权重):\n"
-        for u, v, data in sorted(self.graph.edges(data=True)):
-            info_text += f"- {u} -> {v}: {data['weight']}\n"
-        
-        self.graph_info.insert(tk.END, info_text)
+
+        self.graph_summary.config(text=self.graph.memory_report())
+        self.graph_listing = ge.GraphListing(self.graph)
+        self.reload_graph_info()
+
+    def on_info_kind(self, event=None):
+        """切换节点/边列表时更新列标题和排序选项"""
+        headings, sorts = INFO_KINDS[self.info_kind.get()]
+        for column, text in zip(self.info_tree["columns"], headings):
+            self.info_tree.heading(column, text=text)
+        self.info_sort.config(values=list(sorts.values()))
+        self.info_sort.current(0)
+        self.reload_graph_info()
+
+    def on_info_search(self, event=None):
+        # 输入停顿后再筛选，避免每个按键都重新排序
+        if self.info_after is not None:
+            self.root.after_cancel(self.info_after)
+        self.info_after = self.root.after(200, self.reload_graph_info)
+
+    def reload_graph_info(self, event=None):
+        """按当前的类型、排序和搜索条件重新生成行号，并只显示第一页"""
+        self.info_after = None
+        self.info_tree.delete(*self.info_tree.get_children())
+        self.info_rows, self.info_loaded = [], 0
+        if self.graph_listing is None:
+            return
+
+        kind = self.info_kind.get()
+        sorts = INFO_KINDS[kind][1]
+        sort = list(sorts)[self.info_sort.current()]
+        search = self.info_search.get().lower().strip()
+        if kind == "节点":
+            self.info_rows = self.graph_listing.nodes(sort, search)
+        else:
+            self.info_rows = self.graph_listing.edges(sort, search)
+        self.info_count.config(text=f"共 {len(self.info_rows)} 行")
+        self.load_info_page()
+
+    def load_info_page(self):
+        """向列表末尾追加一页"""
+        row = self.graph_listing.node_row if self.info_kind.get() == "节点" else self.graph_listing.edge_row
+        page = self.info_rows[self.info_loaded:self.info_loaded + INFO_PAGE]
+        for i in page.tolist():
+            self.info_tree.insert("", tk.END, values=row(i))
+        self.info_loaded += len(page)
+        self.info_loading = False
+
+    def on_info_scroll(self, first, last):
+        self.info_scroll.set(first, last)
+        # 滚动到接近底部时加载下一页
+        if float(last) > 0.9 and self.info_loaded < len(self.info_rows) and not self.info_loading:
+            self.info_loading = True
+            self.root.after_idle(self.load_info_page)
 
 
     def create_pagerank_ui(self):
@@ -492,11 +668,20 @@ class TextGraphApp:
         input_frame = tk.Frame(pagerank_frame)
         input_frame.pack(fill=tk.X, pady=5)
 
-        tk.Label(input_frame, text="阻尼因子d (0-1):").pack(side=tk.LEFT)
-        self.d_entry = tk.Entry(input_frame, width=10)
+        tk.Label(input_frame, text="阻尼因子d (0-1，可用逗号分隔多个):").pack(side=tk.LEFT)
+        self.d_entry = tk.Entry(input_frame, width=16)
         self.d_entry.insert(0, "0.85")  # 设置默认值
         self.d_entry.pack(side=tk.LEFT, padx=5)
 
+        tk.Label(input_frame, text="种子词(可选):").pack(side=tk.LEFT)
+        self.seed_entry = tk.Entry(input_frame, width=16)
+        self.seed_entry.pack(side=tk.LEFT, padx=5)
+
+        tk.Label(input_frame, text="求解器:").pack(side=tk.LEFT)
+        self.solver_var = tk.StringVar(value=ge.PAGERANK_SOLVERS[0])
+        solver_menu = tk.OptionMenu(input_frame, self.solver_var, *ge.pagerank_solvers())
+        solver_menu.pack(side=tk.LEFT, padx=5)
+
         self.pagerank_btn = tk.Button(input_frame, text="计算PageRank", 
                                     command=self.calculate_pagerank, state=tk.DISABLED)
         self.pagerank_btn.pack(side=tk.LEFT, padx=5)
@@ -510,8 +695,8 @@ class TextGraphApp:
         """计算并展示PageRank值"""
         # 获取并验证阻尼因子
         try:
-            d = float(self.d_entry.get())
-            if not 0 <= d <= 1:
+            dampings = [float(v) for v in self.d_entry.get().replace('，', ',').split(',') if v.strip()]
+            if not dampings or not all(0 <= d <= 1 for d in dampings):
                 raise ValueError
         except:
             messagebox.showerror("错误", "请输入0到1之间的有效阻尼因子")
@@ -522,46 +707,84 @@ class TextGraphApp:
             messagebox.showwarning("警告", "请先生成图结构")
             return
 
-        # 初始化参数
-        nodes = list(self.graph.nodes())
-        N = len(nodes)
-        pr = {node: 1/N for node in nodes}
-        iterations = 100
-        epsilon = 1e-6
-
-        # PageRank迭代计算
-        for _ in range(iterations):
-            new_pr = {}
-            max_diff = 0
-            for u in nodes:
-                # 计算所有前驱节点的贡献
-                sum_contribution = 0
-                for v in self.graph.predecessors(u):
-                    L_v = self.graph.out_degree(v)  # 出度边的数量
-                    if L_v == 0:
-                        sum_contribution += pr[v] / N  # 处理悬挂节点
-                    else:
-                        sum_contribution += pr[v] / L_v
-                new_pr[u] = (1-d)/N + d * sum_contribution
-                max_diff = max(max_diff, abs(new_pr[u] - pr[u]))
-            pr = new_pr
-            if max_diff < epsilon:
-                break
+        seeds = self.seed_entry.get().lower().split()
+        if len(dampings) > 1 or seeds:
+            self.calculate_pagerank_batch(dampings, seeds)
+            return
+
+        d = dampings[0]
+        graph, solver = self.graph, self.solver_var.get()
+        self.jobs.start(
+            "计算PageRank",
+            lambda job: self.pagerank_cache.solve(graph, d=d, solver=solver,
+                                                  progress=gj.pagerank_progress(job)),
+            lambda result: self.show_pagerank(graph, result),
+            widgets=(self.pagerank_btn,))
+
+    def show_pagerank(self, graph, result):
+        if graph is not self.graph:
+            return
+        pr = result.as_dict()
 
         # 存储结果并展示
         self.pagerank = pr
         sorted_pr = sorted(pr.items(), key=lambda x: x[1], reverse=True)
         
-        # 显示文本结果
-        result_text = "PageRank值（从高到低）:\n\n"
+        # 显示收敛情况和文本结果
+        result_text = result.summary() + "\n\n"
+        result_text += "PageRank值（从高到低）:\n\n"
         for node, value in sorted_pr:
             result_text += f"{node}: {value:.6f}\n"
+        result_text += "\n残差记录:\n" + result.residual_report() + "\n"
+        if not result.converged:
+            self.status_var.set("PageRank达到迭代上限，结果可能未收敛")
+        else:
+            self.status_var.set("PageRank计算完成")
         self.pagerank_result.delete(1.0, tk.END)
         self.pagerank_result.insert(tk.END, result_text)
 
         # 更新图形展示
         self.refresh_graph()
 
+    def calculate_pagerank_batch(self, dampings, seeds):
+        """一次计算多个阻尼因子（及种子词个性化）的PageRank，按配置列出前几名"""
+        configs = [(d, None) for d in dampings]
+        if seeds:
+            configs += [(d, seeds) for d in dampings]
+        graph = self.graph
+        self.jobs.start(
+            "计算PageRank",
+            lambda job: ge.pagerank_batch(graph, configs, progress=gj.pagerank_progress(job)),
+            lambda result: self.show_pagerank_batch(graph, configs, result),
+            widgets=(self.pagerank_btn,),
+            on_error=self.pagerank_failed)
+
+    def pagerank_failed(self, error):
+        messagebox.showerror("错误", str(error))
+        self.status_var.set("PageRank计算失败")
+
+    def show_pagerank_batch(self, graph, configs, result):
+        if graph is not self.graph:
+            return
+
+        # 图形展示使用最后一组配置（有种子词时即个性化结果）
+        self.pagerank = result.column(len(configs) - 1)
+
+        result_text = f"共 {len(configs)} 组配置，每组前 {PAGERANK_TOP} 名:\n"
+        for k, label in enumerate(result.labels):
+            state = "收敛" if result.converged[k] else "未收敛"
+            result_text += f"\n[{label}] {result.iterations[k]} 轮 {state}\n"
+            for node, value in result.top(k, PAGERANK_TOP):
+                result_text += f"  {node}: {value:.6f}\n"
+        if not all(result.converged):
+            self.status_var.set("部分PageRank配置达到迭代上限，结果可能未收敛")
+        else:
+            self.status_var.set("PageRank计算完成")
+        self.pagerank_result.delete(1.0, tk.END)
+        self.pagerank_result.insert(tk.END, result_text)
+
+        self.refresh_graph()
+
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -1,34 +1,43 @@
-import re
+import os
 import random
-from collections import defaultdict
+import re
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-from PIL import Image, ImageTk
 import threading
-import graphviz
+import graph_engine as ge
+import graph_jobs as gj
+import graph_render as gr
+
+MAX_SHOWN_PATHS = 50  # 最多高亮的最短路径条数
+LAYOUT_CACHE_DIR = os.path.join(".graph_cache", "layout")  # 布局坐标缓存目录
+PATH_COLORS = ['blue', 'yellow', 'green', 'purple', 'pink']  # 各条高亮路径的颜色
+CLICK_SLOP = 3        # 按下与松开相距不超过这么多像素视为点击而非拖动
+SHIFT_MASK = 0x0001   # 事件 state 中表示按住 Shift 的位
 
 class GraphApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Graph Processing Tool")
-        self.graph = defaultdict(lambda: defaultdict(int))
-        self.reverse_graph = defaultdict(list)
-        self.nodes = []
-        self.out_degree = {}
+        self.graph = ge.WordGraph()
+        self.bridge_index = ge.BridgeIndex(self.graph)
         self.pr_values = {}
+        self.pagerank_cache = ge.PageRankCache()
+        self.layout_cache = gr.LayoutCache(LAYOUT_CACHE_DIR)
+        self.render_worker = gr.RenderWorker(root)
+        self.render_request = None  # 最近一次要求显示的 (子图, 高亮路径)
+        self.view = None            # 画布上当前的 ViewportView
 
         # 新增图形控制变量
-        self.img_scale = 1.0
-        self.img_offset_x = 0
-        self.img_offset_y = 0
         self.drag_start_x = 0
         self.drag_start_y = 0
-        self.current_image = None
+        self.press_x = self.press_y = 0
+        self.hover_word = None
         self.auto_render = True  # 新增渲染状态标志
         self.pending_render = False  # 新增待渲染标记
 
         # GUI布局
         self.create_widgets()
+        self.jobs = gj.JobRunner(root, self.status_var, self.cancel_btn)
 
     def create_widgets(self):
         # 文件选择部分
@@ -56,6 +65,26 @@ class GraphApp:
         )
         self.manual_render_btn.pack(side=tk.LEFT)
 
+        # 细节层次：大图只渲染部分节点
+        ttk.Label(self.file_frame, text="显示:").pack(side=tk.LEFT, padx=(10, 0))
+        self.lod_mode = ttk.Combobox(self.file_frame, values=list(gr.LOD_MODES.values()),
+                                     state="readonly", width=12)
+        self.lod_mode.current(0)
+        self.lod_mode.pack(side=tk.LEFT, padx=5)
+        ttk.Label(self.file_frame, text="K:").pack(side=tk.LEFT)
+        self.lod_k = ttk.Spinbox(self.file_frame, from_=10, to=gr.MAX_RENDER_NODES,
+                                 increment=10, width=5)
+        self.lod_k.set(100)
+        self.lod_k.pack(side=tk.LEFT)
+        ttk.Label(self.file_frame, text="最小权重:").pack(side=tk.LEFT, padx=(5, 0))
+        self.lod_weight = ttk.Spinbox(self.file_frame, from_=1, to=1000, width=4)
+        self.lod_weight.set(1)
+        self.lod_weight.pack(side=tk.LEFT)
+        ttk.Label(self.file_frame, text="邻域步数:").pack(side=tk.LEFT, padx=(5, 0))
+        self.lod_radius = ttk.Spinbox(self.file_frame, from_=1, to=5, width=3)
+        self.lod_radius.set(1)
+        self.lod_radius.pack(side=tk.LEFT)
+
         # 图显示区域
         self.graph_frame = ttk.Frame(self.root)
         self.graph_frame.pack(pady=5)
@@ -66,7 +95,21 @@ class GraphApp:
         self.canvas.bind("<ButtonPress-1>", self.start_drag)
         self.canvas.bind("<B1-Motion>", self.on_drag)
         self.canvas.bind("<MouseWheel>", self.on_zoom)
-        
+        self.canvas.bind("<Configure>", self.on_resize)
+        # 点击节点填入查询单词（按住 Shift 填入第二个单词），悬停显示节点信息
+        self.canvas.bind("<ButtonRelease-1>", self.on_click)
+        self.canvas.bind("<Motion>", self.on_hover)
+        self.canvas.bind("<Leave>", self.on_leave)
+        
+        # 状态栏：显示后台任务进度，可取消正在运行的任务
+        status_frame = ttk.Frame(self.root)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        self.cancel_btn = ttk.Button(status_frame, text="取消任务")
+        self.cancel_btn.pack(side=tk.RIGHT)
+        self.status_var = tk.StringVar(value="准备就绪")
+        ttk.Label(status_frame, textvariable=self.status_var, anchor=tk.W).pack(
+            side=tk.LEFT, fill=tk.X, expand=True)
+
         # 功能选项卡
         self.notebook = ttk.Notebook(self.root)
         
@@ -109,14 +152,39 @@ class GraphApp:
         
         # 如果切换回自动模式且有未渲染的更新
         if self.auto_render and self.pending_render:
-            self.show_graph()
-            self.pending_render = False
+            self.submit_render()
 
     def force_render(self):
         """手动触发渲染"""
         if self.pending_render:
-            self.show_graph()
-            self.pending_render = False
+            self.submit_render()
+
+    def request_render(self, graph, paths=None):
+        """记录最新的渲染请求，自动渲染时立即交给后台线程"""
+        self.render_request = (graph, paths)
+        if self.auto_render:
+            self.submit_render()
+        else:
+            self.pending_render = True
+
+    def submit_render(self):
+        """在后台线程计算布局，之前未完成的请求全部作废"""
+        graph, paths = self.render_request
+        self.pending_render = False
+        self.render_worker.submit(
+            lambda stale: self.layout_cache.get(graph, "dot", stale=stale),
+            lambda layout: self.show_layout(graph, layout, paths),
+            self.render_failed)
+
+    def show_layout(self, graph, layout, paths):
+        """在画布上绘制布局，布局不变时保持当前的平移和缩放"""
+        if self.view is None or self.view.layout is not layout:
+            self.view = gr.ViewportView(self.canvas, graph, layout, colors=PATH_COLORS)
+            self.view.fit()
+        self.view.style(paths=paths)
+
+    def render_failed(self, error):
+        messagebox.showerror("错误", f"无法生成图形: {error}")
 
     def create_bridge_widgets(self):
         ttk.Label(self.bridge_tab, text="单词1:").grid(row=0, column=0, padx=5, pady=5)
@@ -148,12 +216,28 @@ class GraphApp:
         self.end_entry = ttk.Entry(self.shortest_tab)
         self.end_entry.grid(row=1, column=1)
         
-        ttk.Button(self.shortest_tab, text="查找路径", command=self.find_shortest).grid(row=2, column=0, columnspan=2)
+        self.shortest_btn = ttk.Button(self.shortest_tab, text="查找路径", command=self.find_shortest)
+        self.shortest_btn.grid(row=2, column=0, columnspan=2)
         self.shortest_result = ttk.Label(self.shortest_tab, text="")
         self.shortest_result.grid(row=3, column=0, columnspan=2)
 
     def create_pagerank_widgets(self):
-        ttk.Button(self.pagerank_tab, text="计算PageRank", command=self.compute_pagerank).pack(pady=5)
+        control_frame = ttk.Frame(self.pagerank_tab)
+        control_frame.pack(pady=5)
+        # 转移概率：按边权重（出现次数）分配，或按出边数量平均分配
+        self.pr_weighted = tk.BooleanVar(value=True)
+        ttk.Radiobutton(control_frame, text="按边权重", variable=self.pr_weighted,
+                        value=True).pack(side=tk.LEFT, padx=5)
+        ttk.Radiobutton(control_frame, text="按出边数量", variable=self.pr_weighted,
+                        value=False).pack(side=tk.LEFT, padx=5)
+        self.pr_solver = ttk.Combobox(control_frame, values=ge.pagerank_solvers(),
+                                      state="readonly", width=12)
+        self.pr_solver.current(0)
+        self.pr_solver.pack(side=tk.LEFT, padx=5)
+        self.pagerank_btn = ttk.Button(control_frame, text="计算PageRank", command=self.compute_pagerank)
+        self.pagerank_btn.pack(side=tk.LEFT, padx=5)
+        self.pr_summary = ttk.Label(self.pagerank_tab, text="")
+        self.pr_summary.pack()
         self.pagerank_text = tk.Text(self.pagerank_tab, height=10, width=50)
         self.pagerank_text.pack()
 
@@ -207,31 +291,21 @@ class GraphApp:
         threading.Thread(target=self.run_traversal).start()
 
     def run_traversal(self):
-        # 随机选择起始节点
-        current = random.choice(list(self.graph.keys()))
-        visited_edges = set()
+        # 随机选择起始节点，遇到无出边节点或重复边时结束
+        walk = ge.random_walk(self.graph)
         
         while self.traversal_running:
+            try:
+                current = next(walk)
+            except StopIteration as stop:
+                # 检查重复边
+                if stop.value is not None:
+                    self.traversal_path.append(f"重复边: {stop.value}")
+                break
+
             self.traversal_path.append(current)
             self.update_path_display(current)
             
-            # 获取当前节点的出边
-            neighbors = list(self.graph[current].items())
-            if not neighbors:
-                break
-                
-            # 随机选择下一条边
-            next_node, weight = random.choice(neighbors)
-            edge = (current, next_node)
-            
-            # 检查重复边
-            if edge in visited_edges:
-                self.traversal_path.append(f"重复边: {edge}")
-                break
-                
-            visited_edges.add(edge)
-            current = next_node
-            
             # 检查停止事件
             if self.stop_event.wait(0.1):
                 break
@@ -277,40 +351,41 @@ class GraphApp:
         filepath = filedialog.askopenfilename(filetypes=[("Text files", "*.txt")])
         if filepath:
             self.file_label.config(text=filepath)
-            with open(filepath, 'r', encoding='utf8') as f:
-                text = f.read().lower()
-            self.build_graph(text)
-            self.show_graph()
-
-    def build_graph(self, text):
-        self.graph.clear()
-        self.reverse_graph.clear()
-        words = re.findall(r'\b\w+\b', text)
-        nodes = set()
-        for i in range(len(words)-1):
-            u, v = words[i], words[i+1]
-            self.graph[u][v] += 1  # 记录u到v的边权重
-            self.reverse_graph[v].append(u)
-            nodes.add(u)
-            nodes.add(v)
-        self.nodes = list(nodes)
-        self.out_degree = {u: sum(v.values()) for u, v in self.graph.items()}
+            self.jobs.start("加载文件", lambda job: self.build_graph(filepath, job),
+                            self.set_graph, widgets=(self.file_btn,))
+
+    def build_graph(self, filepath, job):
+        # 在后台线程中分块读取文件，边读边统计相邻单词对
+        graph = ge.build_graph_from_file(filepath, chunk_size=gj.CHUNK_SIZE,
+                                         progress=gj.words_progress(job))
+        return graph, ge.BridgeIndex(graph)
+
+    def set_graph(self, result):
+        # 丢弃旧图的视图与未完成的渲染，新布局到达之前画布保持空白
+        self.render_worker.cancel()
+        if self.view is not None:
+            self.view.clear()
+            self.view = None
+        self.hover_word = None
+        self.graph, self.bridge_index = result
+        self.pr_values = {}
+        self.status_var.set(f"已加载 {len(self.graph)} 个单词")
+        self.show_graph()
+
+    def view_graph(self, paths=None):
+        """按显示设置选出要渲染的子图，邻域模式下高亮路径上的单词总会保留"""
+        mode = list(gr.LOD_MODES)[self.lod_mode.current()]
+        try:
+            k, min_weight, radius = int(self.lod_k.get()), int(self.lod_weight.get()), int(self.lod_radius.get())
+        except ValueError:
+            k, min_weight, radius = 100, 1, 1
+        path_words = {w for path in paths or () for w in path}
+        centers = path_words or {self.word1_entry.get().lower(), self.start_entry.get().lower()} - {""}
+        return gr.level_of_detail(self.graph, mode, k, min_weight, pagerank=self.pr_values,
+                                  centers=centers, radius=radius, keep=path_words)
 
     def show_graph(self):
-        if not self.auto_render:
-            self.pending_render = True
-            return
-
-        dot = graphviz.Digraph()
-        for u in self.graph:
-            dot.node(u)
-            for v, w in self.graph[u].items():
-                dot.edge(u, v, label=str(w))
-        dot.render('graph', format='png', cleanup=True)
-        img = Image.open('graph.png')
-        # img = img.resize((800, 600), Image.Resampling.LANCZOS)
-        self.img_tk = ImageTk.PhotoImage(img)
-        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.img_tk)
+        self.request_render(self.view_graph())
 
     def find_bridge(self):
         word1 = self.word1_entry.get().lower()
@@ -320,10 +395,7 @@ class GraphApp:
             self.bridge_result.config(text=f"No {word1} or {word2} in the graph!")
             return
         
-        bridges = []
-        for word3 in self.graph.get(word1, {}):
-            if word2 in self.graph.get(word3, {}):
-                bridges.append(word3)
+        bridges = self.bridge_index.lookup(word1, word2)
         
         if not bridges:
             self.bridge_result.config(text=f"No bridge words from {word1} to {word2}!")
@@ -338,20 +410,18 @@ class GraphApp:
             self.newtext_result.config(text=new_text)
             return
         
+        # 一次性批量查询所有相邻单词对，只有查询用小写，输出保留原文大小写
+        lowered = [w.lower() for w in words]
+        all_bridges = self.bridge_index.batch(list(zip(lowered, lowered[1:])))
+        
         result = []
         for i in range(len(words)-1):
-            a = words[i].lower()
-            b = words[i+1].lower()
             result.append(words[i])
             
-            if a in self.graph and b in self.graph:
-                bridges = []
-                for word3 in self.graph.get(a, {}):
-                    if b in self.graph.get(word3, {}):
-                        bridges.append(word3)
-                if bridges:
-                    bridge = random.choice(bridges)
-                    result.append(bridge)
+            bridges = all_bridges[i]
+            if bridges:
+                bridge = random.choice(bridges)
+                result.append(bridge)
         
         result.append(words[-1])
         self.newtext_result.config(text=' '.join(result))
@@ -364,133 +434,117 @@ class GraphApp:
             messagebox.showerror("错误", "单词不存在于图中")
             return
         
-        # 实现Dijkstra算法
-        distances = {node: float('inf') for node in self.nodes}
-        distances[start] = 0
-        predecessors = defaultdict(list)
-        visited = set()
-        
-        while len(visited) < len(self.nodes):
-            current = min(
-                (node for node in self.nodes if node not in visited), 
-                key=lambda x: distances[x]
-            )
-            visited.add(current)
-            
-            for neighbor, weight in self.graph[current].items():
-                if distances[current] + weight < distances[neighbor]:
-                    distances[neighbor] = distances[current] + weight
-                    predecessors[neighbor] = [current]
-                elif distances[current] + weight == distances[neighbor]:
-                    predecessors[neighbor].append(current)
-        
-        if distances[end] == float('inf'):
+        graph = self.graph
+        self.jobs.start(
+            "查找最短路径",
+            lambda job: ge.all_shortest_paths(graph, start, end, limit=MAX_SHOWN_PATHS,
+                                              progress=gj.settled_progress(job)),
+            lambda result: self.show_shortest(graph, *result),
+            widgets=(self.shortest_btn,))
+
+    def show_shortest(self, graph, length, total, paths):
+        if graph is not self.graph:
+            return
+        self.status_var.set("最短路径查找完成")
+        if not paths:
             self.shortest_result.config(text="不可达")
             return
         
-        # 收集所有路径
-        paths = []
-        def collect_paths(node, path):
-            if node == start:
-                paths.append([start] + path)
-            else:
-                for pred in predecessors[node]:
-                    collect_paths(pred, [node] + path)
-        
-        collect_paths(end, [])
-        paths = [p for p in paths]
-        
-        if self.auto_render:
-            self.highlight_path(paths)
-        else:
-            self.pending_render = True
-
-        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.img_tk)
-        self.shortest_result.config(text=f"最短路径长度: {distances[end]}\n路径: {' -> '.join(paths[0])}")
-
-    def render_and_show(self, dot):
-        """通用渲染显示方法"""
-        dot.render('temp_graph', format='png', cleanup=True)
-        img = Image.open('temp_graph.png')
-        # img = img.resize((800, 600), Image.Resampling.LANCZOS)
-        self.img_tk = ImageTk.PhotoImage(img)
-        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.img_tk)
+        self.highlight_path(paths)
+        self.shortest_result.config(
+            text=f"最短路径长度: {length}\n最短路径数: {total}\n路径: {' -> '.join(paths[0])}")
 
     def highlight_path(self, paths):
         """独立出来的路径高亮渲染方法"""
-        # 高亮显示路径
-        dot = graphviz.Digraph()
-        for u in self.graph:
-            dot.node(u)
-            for v, w in self.graph[u].items():
-                dot.edge(u, v, label=str(w))
-        
-        edges = set()
-        colors = ['blue', 'yellow', 'green', 'purple', 'pink']
-        for c, path in enumerate(paths):
-            for i in range(len(path)-1):
-                if (path[i], path[i+1]) not in edges:
-                    dot.edge(path[i], path[i+1], color=colors[c % len(colors)], penwidth='2')
-                    edges.add((path[i], path[i+1]))
- 
-        # 添加渲染控制
-        if self.auto_render:
-            self.render_and_show(dot)
+        self.request_render(self.view_graph(paths), paths)
 
     def start_drag(self, event):
-        self.drag_start_x = event.x
-        self.drag_start_y = event.y
+        self.drag_start_x = self.press_x = event.x
+        self.drag_start_y = self.press_y = event.y
+
+    def on_click(self, event):
+        """点击的单词作为桥接词和最短路径的第一个单词，按住 Shift 时作为第二个"""
+        if max(abs(event.x - self.press_x), abs(event.y - self.press_y)) > CLICK_SLOP:
+            return
+        word = self.canvas_word(event)
+        if word is None:
+            return
+        if event.state & SHIFT_MASK:
+            entries = (self.word2_entry, self.end_entry)
+        else:
+            entries = (self.word1_entry, self.start_entry)
+        for entry in entries:
+            entry.delete(0, tk.END)
+            entry.insert(0, word)
+
+    def canvas_word(self, event):
+        """事件位置处的单词，不在当前图中的单词视为 None"""
+        if self.view is None:
+            return None
+        word = self.view.node_at(event.x, event.y)
+        return word if word in self.graph else None
+
+    def on_hover(self, event):
+        word = self.canvas_word(event)
+        if word == self.hover_word:
+            return
+        self.hover_word = word
+        if word is None:
+            gr.hide_tooltip(self.canvas)
+        else:
+            gr.show_tooltip(self.canvas, event.x, event.y,
+                            gr.node_info(self.graph, word, self.pr_values))
+
+    def on_leave(self, event):
+        self.hover_word = None
+        gr.hide_tooltip(self.canvas)
 
     def on_drag(self, event):
         delta_x = event.x - self.drag_start_x
         delta_y = event.y - self.drag_start_y
-        self.canvas.move("all", delta_x, delta_y)
+        if self.view is not None:
+            self.view.pan(delta_x, delta_y)
+            self.hover_word = None   # 重绘会清除提示框
         self.drag_start_x = event.x
         self.drag_start_y = event.y
 
     def on_zoom(self, event):
         scale_factor = 1.1 if event.delta > 0 else 0.9
-        self.img_scale *= scale_factor
-        
-        # 获取当前画布中心
-        x = self.canvas.canvasx(event.x)
-        y = self.canvas.canvasy(event.y)
-        
-        # 缩放图形
-        self.canvas.scale("all", x, y, scale_factor, scale_factor)
+        # 以鼠标位置为中心缩放，停下后按新比例重新绘制视口内的部分
+        if self.view is not None:
+            self.view.zoom(scale_factor, event.x, event.y)
+            self.hover_word = None
+
+    def on_resize(self, event):
+        if self.view is not None:
+            self.view.schedule_redraw()
 
     def compute_pagerank(self):
-        d = 0.85
-        max_iter = 100
-        tol = 1e-6
-        N = len(self.nodes)
-        
-        if N == 0:
+        if len(self.graph) == 0:
             return
         
-        pr = {node: 1.0/N for node in self.nodes}
-        
-        for _ in range(max_iter):
-            new_pr = {}
-            # 计算所有出度为0节点的总贡献
-            zero_out_pr = sum(pr[node] for node in self.nodes if self.out_degree.get(node, 0) == 0)
-            common_contribution = (zero_out_pr / N) * d if N > 0 else 0
-            
-            for node in self.nodes:
-                # 正常入链贡献
-                incoming = sum(pr[v]/self.out_degree[v] for v in self.reverse_graph.get(node, []) if self.out_degree[v] > 0)
-                
-                new_pr[node] = (1-d)/N + d * incoming + common_contribution
-            
-            # 检查收敛
-            if sum(abs(new_pr[n] - pr[n]) for n in self.nodes) < tol:
-                break
-            pr = new_pr
+        # 前驱索引按边去重并带权重，悬挂节点的PR值平均分给所有节点
+        graph, weighted, solver = self.graph, self.pr_weighted.get(), self.pr_solver.get()
+        self.jobs.start(
+            "计算PageRank",
+            lambda job: self.pagerank_cache.solve(graph, d=0.85, weighted=weighted, solver=solver,
+                                                  progress=gj.pagerank_progress(job)),
+            lambda result: self.show_pagerank(graph, result),
+            widgets=(self.pagerank_btn,))
+
+    def show_pagerank(self, graph, result):
+        if graph is not self.graph:
+            return
+        self.status_var.set("PageRank计算完成")
+        pr = result.as_dict()
+        self.pr_values = pr
+        self.pr_summary.config(text=result.summary())
         
         sorted_pr = sorted(pr.items(), key=lambda x: x[1], reverse=True)
         self.pagerank_text.delete(1.0, tk.END)
         for node, value in sorted_pr:
             self.pagerank_text.insert(tk.END, f"{node}: {value:.6f}\n")
+        self.pagerank_text.insert(tk.END, "\n残差记录:\n" + result.residual_report() + "\n")
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,519 @@
+"""graph_engine 性能基准
+
+用法: python bench.py [--file 文本文件] <命令> [选项]
+
+    build     建图速度（原有循环 vs GraphBuilder vs NumPy 批量）
+    parallel  多进程建图速度，并校验结果与单进程完全一致
+    parallel-check  多进程建图在小文件、多种分片数、非 ASCII 与空文件上的正确性
+    bridge    桥接词查询吞吐（逐对扫描 vs BridgeIndex）
+    bridge-all  全图“所有有桥接词的单词对”统计（嵌套循环 vs 稀疏 A·A）
+    shortest  最短路径（app2 原有 O(V²) Dijkstra vs 二叉堆 + 提前终止）
+    pagerank  PageRank 迭代速度（原有字典循环 vs 稀疏矩阵向量乘）
+    pagerank-check  PageRank 结果与参考实现（及 networkx）交叉校验
+    pagerank-solvers  各 PageRank 求解器收敛到同一精度所需的轮数与耗时
+    pagerank-batch  多组阻尼系数 / 种子词：逐组求解 vs N×K 矩阵一次迭代
+    startup   界面模块的冷启动导入耗时（python -X importtime），并检查没有提前
+              载入 numpy / graphviz 等重量级模块
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import graph_engine as ge
+
+DEFAULT_FILE = "Cursed Be The Treasure.txt"
+HEAVY_MODULES = ("numpy", "scipy", "graphviz", "PIL", "matplotlib", "networkx")
+
+
+def load_words(path, repeat=1):
+    with open(path, 'r', encoding='utf-8') as f:
+        words = ge.preprocess_text(f.read())
+    return words * repeat
+
+
+def timeit(func, *args, rounds=3):
+    """返回多次运行中的最短耗时（秒）和最后一次的结果"""
+    best = float('inf')
+    result = None
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def legacy_dict_build(words):
+    """app2.py 原有的嵌套 defaultdict 建图方式"""
+    graph = defaultdict(lambda: defaultdict(int))
+    for i in range(len(words) - 1):
+        graph[words[i]][words[i + 1]] += 1
+    return graph
+
+
+def legacy_nx_build(words):
+    """app.py 原有的 networkx 逐边建图方式"""
+    import networkx as nx
+    graph = nx.DiGraph()
+    for i in range(len(words) - 1):
+        if graph.has_edge(words[i], words[i + 1]):
+            graph[words[i]][words[i + 1]]['weight'] += 1
+        else:
+            graph.add_edge(words[i], words[i + 1], weight=1)
+    return graph
+
+
+def bench_build(args):
+    builders = [("defaultdict 循环", legacy_dict_build),
+                ("networkx 循环", legacy_nx_build),
+                ("GraphBuilder", ge.build_graph),
+                ("NumPy 批量", ge.build_graph_bulk)]
+    for repeat in sorted({1, args.repeat}):
+        words = load_words(args.file, repeat)
+        print(f"\n{len(words)} 个单词 (x{repeat}):")
+        for name, func in builders:
+            try:
+                seconds, _ = timeit(func, words, rounds=args.rounds)
+            except ImportError as e:
+                print(f"  {name:<16} 跳过 ({e})")
+                continue
+            rate = (len(words) - 1) / seconds
+            print(f"  {name:<16} {seconds * 1000:10.1f} ms  {rate / 1e6:8.2f} M 边/秒")
+
+
+def same_graph(a, b):
+    names = ('words', 'out_ptr', 'out_idx', 'out_w', 'in_ptr', 'in_idx', 'in_w')
+    return all(getattr(a, n) == getattr(b, n) for n in names)
+
+
+# 多进程建图的边界情况：分片边界可能落在多字节字符、标点或空白中间
+PARALLEL_CASES = [
+    ("空文件", ""),
+    ("只有空白", " \n\t \n"),
+    ("单个单词", "word"),
+    ("非 ASCII", "Café naïve résumé, café—NAÏVE über straße; 中文 单词 中文\n" * 50),
+    ("无结尾换行", "the end of the text the end"),
+]
+
+
+def check_parallel(path, shard_counts):
+    """逐一比较多进程与单进程建图结果，返回是否全部一致"""
+    with open(path, 'r', encoding='utf-8') as f:
+        cases = [(os.path.basename(path), f.read())] + PARALLEL_CASES
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, text in cases:
+            case_path = os.path.join(tmp, "case.txt")
+            with open(case_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            serial = ge.build_graph_from_file(case_path)
+            failed = [shards for shards in shard_counts
+                      if not same_graph(serial, ge.build_graph_parallel(case_path, 2, shards))]
+            ok &= not failed
+            result = "通过" if not failed else f"失败（分片数 {failed}）"
+            print(f"  {name:<24} {len(serial):>6} 个节点  {result}")
+    return ok
+
+
+def bench_parallel_check(args):
+    print(f"多进程建图正确性，分片数 {args.shards}:")
+    if not check_parallel(args.file, args.shards):
+        raise SystemExit(1)
+
+
+def bench_parallel(args):
+    bench_parallel_check(args)
+    with open(args.file, 'r', encoding='utf-8') as f:
+        text = f.read()
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.txt', delete=False) as f:
+        for _ in range(args.repeat):
+            f.write(text)
+        path = f.name
+    try:
+        size = os.path.getsize(path) / 2 ** 20
+        print(f"{size:.1f} MB (x{args.repeat}), CPU 核数 {os.cpu_count()}:")
+        serial_time, serial = timeit(ge.build_graph_from_file, path, rounds=args.rounds)
+        print(f"  单进程          {serial_time:8.2f} s")
+        workers = 2
+        while workers <= max(args.workers, 2):
+            seconds, graph = timeit(ge.build_graph_parallel, path, workers, rounds=args.rounds)
+            if not same_graph(serial, graph):
+                print(f"  {workers:>2} 进程结果与单进程不一致")
+                raise SystemExit(1)
+            print(f"  {workers:>2} 进程         {seconds:8.2f} s  加速 {serial_time / seconds:5.2f}x  结果一致")
+            workers *= 2
+    finally:
+        os.remove(path)
+
+
+def bridge_pairs(words, graph, count):
+    """一半取自原文相邻单词对（文本扩展的典型输入），一半随机组合"""
+    rng = random.Random(0)
+    pairs = list(zip(words, words[1:]))[:count // 2]
+    pairs += [(rng.choice(graph.words), rng.choice(graph.words))
+              for _ in range(count - len(pairs))]
+    return pairs
+
+
+def bench_bridge(args):
+    words = load_words(args.file)
+    graph = ge.build_graph_bulk(words)
+    pairs = bridge_pairs(words, graph, args.pairs)
+    print(f"{len(pairs)} 组查询, {len(graph)} 个节点, {graph.number_of_edges()} 条边:")
+
+    def scan():
+        return [ge.find_bridge_words_for_pair(graph, a, b) for a, b in pairs]
+
+    seconds, expected = timeit(scan, rounds=1)
+    print(f"  {'逐对扫描':<20} {seconds * 1000:9.1f} ms  {len(pairs) / seconds:10.0f} 次/秒")
+
+    for name, eager in (("BridgeIndex 惰性", False), ("BridgeIndex 预计算", True)):
+        t0 = time.perf_counter()
+        index = ge.BridgeIndex(graph, eager=eager, max_entries=args.max_entries)
+        build = time.perf_counter() - t0
+        cold, result = timeit(index.batch, pairs, rounds=1)
+        assert result == expected
+        warm, _ = timeit(index.batch, pairs, rounds=1)
+        print(f"  {name:<20} {cold * 1000:9.1f} ms  {len(pairs) / cold:10.0f} 次/秒"
+              f"  (缓存命中 {len(pairs) / warm:.0f} 次/秒, 创建 {build * 1000:.0f} ms,"
+              f" 缓存 {index.entries} 条)")
+
+
+def bench_bridge_all(args):
+    graph = ge.build_graph_bulk(load_words(args.file))
+    N = len(graph)
+    print(f"{N} 个节点, 共 {N * N} 个单词对:")
+
+    # 嵌套循环太慢，只抽样部分源节点后按比例估算
+    sample = random.Random(0).sample(graph.words, min(args.sample, N))
+
+    def nested():
+        found = 0
+        for word1 in sample:
+            for word2 in graph.words:
+                if ge.find_bridge_words_for_pair(graph, word1, word2):
+                    found += 1
+        return found
+
+    seconds, _ = timeit(nested, rounds=1)
+    print(f"  嵌套循环        {seconds * N / len(sample):9.1f} s (由 {len(sample)} 个源节点估算)")
+
+    seconds, table = timeit(ge.bridge_table, graph, rounds=args.rounds)
+    print(f"  稀疏 A·A        {seconds:9.2f} s  {len(table)} 个单词对有桥接词,"
+          f" 共 {len(table.bridges)} 个桥接词, 最多 {table.counts.max()} 个")
+
+
+def legacy_find_shortest(graph, nodes, start):
+    """app2.py 原有的 Dijkstra：每轮线性扫描未访问节点取最小值"""
+    distances = {node: float('inf') for node in nodes}
+    distances[start] = 0
+    predecessors = defaultdict(list)
+    visited = set()
+    while len(visited) < len(nodes):
+        current = min((node for node in nodes if node not in visited),
+                      key=lambda x: distances[x])
+        visited.add(current)
+        for neighbor, weight in graph[current].items():
+            if distances[current] + weight < distances[neighbor]:
+                distances[neighbor] = distances[current] + weight
+                predecessors[neighbor] = [current]
+            elif distances[current] + weight == distances[neighbor]:
+                predecessors[neighbor].append(current)
+    return distances, predecessors
+
+
+def bench_shortest(args):
+    words = load_words(args.file)
+    graph = ge.build_graph_bulk(words)
+    rng = random.Random(0)
+    queries = [(rng.choice(graph.words), rng.choice(graph.words)) for _ in range(args.queries)]
+    print(f"{len(graph)} 个节点, {graph.number_of_edges()} 条边, {len(queries)} 组查询:")
+
+    legacy = legacy_dict_build(words)
+    nodes = graph.nodes()
+    start, end = queries[0]
+    seconds, (distances, _) = timeit(legacy_find_shortest, legacy, nodes, start, rounds=1)
+    print(f"  原有 O(V²)        {seconds * 1000:10.1f} ms/次 (只测 1 次)")
+
+    def run(early):
+        for a, b in queries:
+            ge.shortest_path_dag(graph, graph.index[a], graph.index[b] if early else None)
+
+    for name, early in (("二叉堆 单源全图", False), ("二叉堆 提前终止", True)):
+        seconds, _ = timeit(run, early, rounds=args.rounds)
+        print(f"  {name:<16} {seconds * 1000 / len(queries):10.2f} ms/次")
+
+    length, _, _ = ge.all_shortest_paths(graph, start, end)
+    expected = distances[end] if distances[end] != float('inf') else None
+    ok = length == expected
+    print(f"  {start} → {end} 长度 {length}，原有实现 {expected}  {'通过' if ok else '失败'}")
+    if not ok:
+        raise SystemExit(1)
+
+
+def legacy_app_pagerank(graph, d, iterations):
+    """app.py 原有的 PageRank 循环（networkx 图）"""
+    nodes = list(graph.nodes())
+    N = len(nodes)
+    pr = {node: 1 / N for node in nodes}
+    for _ in range(iterations):
+        new_pr = {}
+        for u in nodes:
+            sum_contribution = 0
+            for v in graph.predecessors(u):
+                sum_contribution += pr[v] / graph.out_degree(v)
+            new_pr[u] = (1 - d) / N + d * sum_contribution
+        pr = new_pr
+    return pr
+
+
+def legacy_app2_structures(words):
+    """app2.py 原有 build_graph 生成的 reverse_graph、nodes 与 out_degree"""
+    graph = legacy_dict_build(words)
+    reverse_graph = defaultdict(list)
+    for i in range(len(words) - 1):
+        reverse_graph[words[i + 1]].append(words[i])
+    out_degree = {u: sum(v.values()) for u, v in graph.items()}
+    return reverse_graph, list(set(words)), out_degree
+
+
+def legacy_app2_pagerank(structures, d, iterations):
+    """app2.py 原有的 PageRank 循环（每次出现都追加一次前驱）"""
+    reverse_graph, nodes, out_degree = structures
+    N = len(nodes)
+    pr = {node: 1.0 / N for node in nodes}
+    for _ in range(iterations):
+        zero_out_pr = sum(pr[node] for node in nodes if out_degree.get(node, 0) == 0)
+        common = (zero_out_pr / N) * d
+        pr = {node: (1 - d) / N + d * sum(pr[v] / out_degree[v]
+                                          for v in reverse_graph.get(node, [])) + common
+              for node in nodes}
+    return pr
+
+
+def bench_pagerank(args):
+    words = load_words(args.file, args.repeat)
+    graph = ge.build_graph_bulk(words)
+    n = args.iterations
+    print(f"{len(graph)} 个节点, {graph.number_of_edges()} 条边, 每种实现固定迭代 {n} 轮:")
+
+    def report(name, seconds):
+        print(f"  {name:<20} {seconds * 1000:10.1f} ms  {n / seconds:10.1f} 轮/秒")
+
+    try:
+        import networkx as nx
+        nx_graph = nx.DiGraph()
+        nx_graph.add_weighted_edges_from(graph.edges())
+        report("app.py 原有循环", timeit(legacy_app_pagerank, nx_graph, 0.85, n, rounds=1)[0])
+    except ImportError as e:
+        print(f"  app.py 原有循环 跳过 ({e})")
+    structures = legacy_app2_structures(words)
+    report("app2.py 原有循环", timeit(legacy_app2_pagerank, structures, 0.85, n, rounds=1)[0])
+
+    for weighted in (False, True):
+        name = "稀疏矩阵 " + ("加权" if weighted else "不加权")
+        report(name, timeit(ge.pagerank, graph, 0.85, weighted, n, 0, rounds=args.rounds)[0])
+
+
+def reference_pagerank(graph, d, weighted, iterations):
+    """按定义逐条边计算的参考 PageRank，用于校验"""
+    edges = list(graph.edges())
+    nodes = graph.nodes()
+    N = len(nodes)
+    out_total = dict.fromkeys(nodes, 0)
+    for u, v, w in edges:
+        out_total[u] += w if weighted else 1
+    pr = dict.fromkeys(nodes, 1.0 / N)
+    for _ in range(iterations):
+        dangling = sum(pr[u] for u in nodes if out_total[u] == 0)
+        new_pr = dict.fromkeys(nodes, (1 - d) / N + d * dangling / N)
+        for u, v, w in edges:
+            new_pr[v] += d * pr[u] * (w if weighted else 1) / out_total[u]
+        pr = new_pr
+    return pr
+
+
+def bench_pagerank_check(args):
+    words = load_words(args.file)
+    graph = ge.build_graph_bulk(words)
+    n = args.iterations
+    failed = False
+
+    def check(name, result, expected, tol):
+        nonlocal failed
+        err = max(abs(result[k] - expected[k]) for k in expected)
+        ok = err <= tol and len(result) == len(expected)
+        failed |= not ok
+        print(f"  {name:<36} 最大误差 {err:.2e}  {'通过' if ok else '失败'}")
+
+    for weighted in (True, False):
+        mode = "加权" if weighted else "不加权"
+        result = ge.pagerank(graph, 0.85, weighted, n, 0)
+        check(f"{mode} vs 参考实现", result, reference_pagerank(graph, 0.85, weighted, n), 1e-12)
+        try:
+            import networkx as nx
+        except ImportError:
+            continue
+        nx_graph = nx.DiGraph()
+        nx_graph.add_weighted_edges_from(graph.edges())
+        expected = nx.pagerank(nx_graph, 0.85, weight='weight' if weighted else None, tol=1e-14)
+        check(f"{mode} vs networkx", ge.pagerank(graph, 0.85, weighted, 1000, 1e-13),
+              expected, 1e-10)
+
+    # app2 原有实现按出现次数重复累加前驱，数值上等价于加权模式
+    structures = legacy_app2_structures(words)
+    check("加权 vs app2 原有循环", ge.pagerank(graph, 0.85, True, n, 0),
+          legacy_app2_pagerank(structures, 0.85, n), 1e-12)
+    if failed:
+        raise SystemExit(1)
+
+
+def bench_pagerank_solvers(args):
+    graph = ge.build_graph_bulk(load_words(args.file))
+    print(f"{len(graph)} 个节点, 收敛精度 {args.tol:g}:")
+    for d in args.damping:
+        print(f"  d = {d}:")
+        for solver in ge.PAGERANK_SOLVERS:
+            seconds, result = timeit(ge.pagerank_solve, graph, d, False, 1000, args.tol, solver,
+                                     rounds=args.rounds)
+            print(f"    {solver:<14} {result.iterations:5d} 轮  {seconds * 1000:8.1f} ms"
+                  f"  {'收敛' if result.converged else '未收敛'}")
+
+
+def bench_pagerank_batch(args):
+    import numpy as np
+
+    graph = ge.build_graph_bulk(load_words(args.file))
+    rng = random.Random(0)
+    words = graph.nodes()
+    configs = [(d, None) for d in args.damping]
+    configs += [(0.85, rng.sample(words, 3)) for _ in range(args.seeds)]
+    print(f"{len(graph)} 个节点, {len(configs)} 组配置, 收敛精度 {args.tol:g}:")
+
+    def separate():
+        columns = []
+        for d, seeds in configs:
+            columns.append(ge.pagerank_batch(graph, [(d, seeds)], max_iter=1000,
+                                             tol=args.tol).scores[:, 0])
+        return np.column_stack(columns)
+
+    t_sep, ref = timeit(separate, rounds=args.rounds)
+    t_batch, result = timeit(ge.pagerank_batch, graph, configs, False, 1000, args.tol,
+                             rounds=args.rounds)
+    print(f"  逐组求解      {t_sep * 1000:8.1f} ms")
+    print(f"  N×K 一次迭代  {t_batch * 1000:8.1f} ms   ({t_sep / t_batch:.1f}x)")
+    print(f"  最大差异 {np.abs(ref - result.scores).max():.2e}, "
+          f"迭代轮数 {min(result.iterations)}~{max(result.iterations)}")
+
+
+def import_times(module):
+    """用 python -X importtime 导入 module
+
+    返回 {模块名: 累计微秒}，以及 module 直接导入的各模块 [(累计微秒, 模块名)]。
+    """
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise SystemExit(proc.stderr)
+    modules, children = {}, []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line.split("|")
+        cumulative, name = int(parts[1]), parts[2].rstrip()
+        modules[name.strip()] = cumulative
+        # 名称前的缩进表示嵌套层次：顶层一个空格，每深一层多两个
+        if len(name) - len(name.lstrip()) == 3:
+            children.append((cumulative, name.strip()))
+    return modules, children
+
+
+def bench_startup(args):
+    failed = False
+    for module in args.modules:
+        modules, children = import_times(module)
+        command = [sys.executable, "-c", f"import {module}"]
+        seconds, _ = timeit(subprocess.run, command, rounds=args.rounds)
+        heavy = sorted({name.split(".")[0] for name in modules} & set(HEAVY_MODULES))
+        ok = seconds <= args.budget and not heavy
+        failed |= not ok
+        print(f"{module}: 导入 {modules[module] / 1000:.1f} ms，"
+              f"进程冷启动 {seconds * 1000:.1f} ms  {'通过' if ok else '未通过'}")
+        for us, name in sorted(children, reverse=True)[:args.top]:
+            print(f"    {us / 1000:8.1f} ms  {name}")
+        if heavy:
+            print(f"    启动时载入了重量级模块: {', '.join(heavy)}")
+    if failed:
+        raise SystemExit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--file", default=DEFAULT_FILE)
+    parser.add_argument("--rounds", type=int, default=3)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("build", help="建图速度")
+    p.add_argument("--repeat", type=int, default=100)
+    p.set_defaults(func=bench_build)
+
+    p = sub.add_parser("parallel", help="多进程建图速度与正确性")
+    p.add_argument("--repeat", type=int, default=100)
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--shards", type=int, nargs="+", default=[2, 3, 4, 7, 16])
+    p.set_defaults(func=bench_parallel)
+
+    p = sub.add_parser("parallel-check", help="多进程建图正确性")
+    p.add_argument("--shards", type=int, nargs="+", default=[2, 3, 4, 7, 16])
+    p.set_defaults(func=bench_parallel_check)
+
+    p = sub.add_parser("bridge", help="桥接词查询吞吐")
+    p.add_argument("--pairs", type=int, default=40000)
+    p.add_argument("--max-entries", type=int, default=2_000_000)
+    p.set_defaults(func=bench_bridge)
+
+    p = sub.add_parser("bridge-all", help="全图桥接词统计")
+    p.add_argument("--sample", type=int, default=20)
+    p.set_defaults(func=bench_bridge_all)
+
+    p = sub.add_parser("shortest", help="最短路径速度")
+    p.add_argument("--queries", type=int, default=200)
+    p.set_defaults(func=bench_shortest)
+
+    p = sub.add_parser("pagerank", help="PageRank 迭代速度")
+    p.add_argument("--repeat", type=int, default=1)
+    p.add_argument("--iterations", type=int, default=20)
+    p.set_defaults(func=bench_pagerank)
+
+    p = sub.add_parser("pagerank-check", help="PageRank 正确性校验")
+    p.add_argument("--iterations", type=int, default=50)
+    p.set_defaults(func=bench_pagerank_check)
+
+    p = sub.add_parser("pagerank-solvers", help="PageRank 求解器比较")
+    p.add_argument("--tol", type=float, default=1e-10)
+    p.add_argument("--damping", type=float, nargs="+", default=[0.85, 0.95, 0.99])
+    p.set_defaults(func=bench_pagerank_solvers)
+
+    p = sub.add_parser("pagerank-batch", help="批量 PageRank 参数扫描")
+    p.add_argument("--tol", type=float, default=1e-8)
+    p.add_argument("--damping", type=float, nargs="+",
+                   default=[0.5, 0.6, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95])
+    p.add_argument("--seeds", type=int, default=24, help="随机种子词配置的组数")
+    p.set_defaults(func=bench_pagerank_batch)
+
+    p = sub.add_parser("startup", help="界面冷启动导入耗时")
+    p.add_argument("--modules", nargs="+", default=["app", "app2"])
+    p.add_argument("--budget", type=float, default=1.0, help="冷启动时间上限（秒）")
+    p.add_argument("--top", type=int, default=8, help="列出最慢的几个顶层导入")
+    p.set_defaults(func=bench_startup)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
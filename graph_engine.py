@@ -0,0 +1,1643 @@
+"""文本图核心算法模块
+
+不依赖 tkinter / graphviz / PIL，可在无界面的服务器上直接导入使用。
+app.py 与 app2.py 只负责界面展示，所有图相关的计算都在这里完成。
+"""
+import os
+import re
+import sys
+import codecs
+import hashlib
+import itertools
+import heapq
+import random
+import bisect
+from array import array
+from collections import OrderedDict
+
+
+class WordGraph:
+    """以整数编号存储单词的有向加权图
+
+    后继用 CSR 存储：节点 u 的出边为 out_idx[out_ptr[u]:out_ptr[u+1]]，
+    对应权重在 out_w 的同一区间；前驱用 CSC（in_ptr/in_idx/in_w）存储。
+    每行内的节点编号按升序排列，全部数据都保存在连续的 array 中。
+    """
+
+    def __init__(self, words=None, out_ptr=None, out_idx=None, out_w=None,
+                 in_ptr=None, in_idx=None, in_w=None, index=None):
+        self.words = list(words) if words is not None else []   # 编号 -> 单词
+        if index is None:
+            index = {w: i for i, w in enumerate(self.words)}
+        self.index = index                                       # 单词 -> 编号
+        N = len(self.words)
+        self.out_ptr = out_ptr if out_ptr is not None else array('q', [0] * (N + 1))
+        self.out_idx = out_idx if out_idx is not None else array('i')
+        self.out_w = out_w if out_w is not None else array('i')
+        self.parent = None   # 由 extend_graph 生成时记录原图的哈希值
+        if in_ptr is None:
+            self._build_reverse()
+        else:
+            self.in_ptr, self.in_idx, self.in_w = in_ptr, in_idx, in_w
+
+    def _build_reverse(self):
+        """由 CSR 计数排序得到 CSC 前驱索引"""
+        N = len(self.words)
+        out_ptr, out_idx, out_w = self.out_ptr, self.out_idx, self.out_w
+        counts = [0] * (N + 1)
+        for v in out_idx:
+            counts[v + 1] += 1
+        for i in range(N):
+            counts[i + 1] += counts[i]
+        self.in_ptr = array('q', counts)
+
+        pos = counts[:N]
+        in_idx = array('i', bytes(4 * len(out_idx)))
+        in_w = array('i', bytes(4 * len(out_idx)))
+        # 按源节点升序扫描，保证每个前驱行内编号有序
+        for u in range(N):
+            for k in range(out_ptr[u], out_ptr[u + 1]):
+                v = out_idx[k]
+                p = pos[v]
+                in_idx[p] = u
+                in_w[p] = out_w[k]
+                pos[v] = p + 1
+        self.in_idx = in_idx
+        self.in_w = in_w
+
+    def __len__(self):
+        return len(self.words)
+
+    def __contains__(self, word):
+        return word in self.index
+
+    def has_node(self, word):
+        return word in self.index
+
+    def edge_slot(self, a, b):
+        """返回边 a -> b 在 out_idx 中的位置，不存在时返回 -1（a、b 为编号）"""
+        lo, hi = self.out_ptr[a], self.out_ptr[a + 1]
+        k = bisect.bisect_left(self.out_idx, b, lo, hi)
+        if k < hi and self.out_idx[k] == b:
+            return k
+        return -1
+
+    def has_edge(self, u, v):
+        a = self.index.get(u)
+        b = self.index.get(v)
+        return a is not None and b is not None and self.edge_slot(a, b) >= 0
+
+    def weight(self, u, v):
+        k = self.edge_slot(self.index[u], self.index[v])
+        if k < 0:
+            raise KeyError((u, v))
+        return self.out_w[k]
+
+    def nodes(self):
+        return list(self.words)
+
+    def number_of_nodes(self):
+        return len(self.words)
+
+    def number_of_edges(self):
+        return len(self.out_idx)
+
+    def successors(self, word):
+        a = self.index[word]
+        return [self.words[j] for j in self.out_idx[self.out_ptr[a]:self.out_ptr[a + 1]]]
+
+    def predecessors(self, word):
+        a = self.index[word]
+        return [self.words[j] for j in self.in_idx[self.in_ptr[a]:self.in_ptr[a + 1]]]
+
+    def out_degree(self, word):
+        a = self.index[word]
+        return self.out_ptr[a + 1] - self.out_ptr[a]
+
+    def in_degree(self, word):
+        a = self.index[word]
+        return self.in_ptr[a + 1] - self.in_ptr[a]
+
+    def edges(self):
+        """遍历所有边 (u, v, weight)"""
+        words, out_ptr, out_idx, out_w = self.words, self.out_ptr, self.out_idx, self.out_w
+        for a in range(len(words)):
+            for k in range(out_ptr[a], out_ptr[a + 1]):
+                yield words[a], words[out_idx[k]], out_w[k]
+
+    def memory_usage(self):
+        """返回各部分占用的字节数"""
+        arrays = ('out_ptr', 'out_idx', 'out_w', 'in_ptr', 'in_idx', 'in_w')
+        usage = {name: getattr(self, name).itemsize * len(getattr(self, name))
+                 for name in arrays}
+        usage['words'] = sys.getsizeof(self.words) + sum(sys.getsizeof(w) for w in self.words)
+        usage['index'] = sys.getsizeof(self.index)
+        usage['total'] = sum(usage.values())
+        return usage
+
+    def fingerprint(self):
+        """图内容的哈希值，单词表和边完全相同的图得到相同的结果"""
+        if getattr(self, '_fingerprint', None) is None:
+            h = hashlib.sha1()
+            # 单词由空白切分得到，不会包含换行符
+            h.update('\n'.join(self.words).encode('utf-8'))
+            for arr in (self.out_ptr, self.out_idx, self.out_w):
+                h.update(arr.tobytes())
+            self._fingerprint = h.hexdigest()
+        return self._fingerprint
+
+    def memory_report(self):
+        """生成内存占用报告文本"""
+        usage = self.memory_usage()
+        E = max(self.number_of_edges(), 1)
+        lines = [f"节点数量: {self.number_of_nodes()}",
+                 f"边数量: {self.number_of_edges()}"]
+        for name, size in usage.items():
+            lines.append(f"{name:>8}: {size / 1024:10.1f} KB")
+        lines.append(f"每条边平均: {usage['total'] / E:.1f} 字节")
+        return "\n".join(lines)
+
+
+class GraphBuilder:
+    """逐条累加边并最终生成 CSR 格式的 WordGraph"""
+
+    def __init__(self):
+        self.words = []
+        self.index = {}
+        self.counts = {}    # (u << 32) | v -> 权重
+
+    def intern(self, word):
+        """返回单词的编号，不存在时分配新编号"""
+        i = self.index.get(word)
+        if i is None:
+            i = len(self.words)
+            self.index[word] = i
+            self.words.append(word)
+        return i
+
+    def add_edge(self, u, v, weight=1):
+        """累加 u -> v 的边权重（u、v 为单词）"""
+        key = (self.intern(u) << 32) | self.intern(v)
+        self.counts[key] = self.counts.get(key, 0) + weight
+
+    def add_words(self, words):
+        """把相邻单词依次作为边加入"""
+        for i in range(len(words) - 1):
+            self.add_edge(words[i], words[i + 1])
+
+    def build(self):
+        N = len(self.words)
+        keys = sorted(self.counts)
+        out_ptr = array('q', [0] * (N + 1))
+        out_idx = array('i', [key & 0xFFFFFFFF for key in keys])
+        out_w = array('i', [self.counts[key] for key in keys])
+        for key in keys:
+            out_ptr[(key >> 32) + 1] += 1
+        for i in range(N):
+            out_ptr[i + 1] += out_ptr[i]
+        return WordGraph(self.words, out_ptr, out_idx, out_w, index=self.index)
+
+
+def preprocess_text(text):
+    """预处理文本，提取单词"""
+    # 将文本转为小写并替换标点符号为空格
+    text = text.lower()
+    text = re.sub(r'[^\w\s]', ' ', text)
+    return text.split()
+
+
+def build_graph(words):
+    """根据单词序列生成有向图，相邻单词之间的边权重为出现次数"""
+    builder = GraphBuilder()
+    builder.add_words(words)
+    return builder.build()
+
+
+def _to_array(typecode, values):
+    """把 NumPy 数组拷贝为 array.array，便于纯 Python 循环快速访问"""
+    dtype = {'i': 'int32', 'q': 'int64'}[typecode]
+    result = array(typecode)
+    result.frombytes(values.astype(dtype).tobytes())
+    return result
+
+
+def _merge_counts(parts):
+    """合并多段 (边编码, 权重) 计数，返回按边编码排序的去重结果"""
+    import numpy as np
+
+    keys = np.concatenate([k for k, _ in parts])
+    counts = np.concatenate([c for _, c in parts])
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    merged = np.bincount(inverse, weights=counts, minlength=len(uniq)).astype(np.int64)
+    return uniq, merged
+
+
+def _graph_from_counts(words, index, keys, weights):
+    """由排序后的 (源 << 32 | 目标) 边编码和权重生成 CSR/CSC 图"""
+    import numpy as np
+
+    N = len(words)
+    src = keys >> 32
+    dst = keys & 0xFFFFFFFF
+
+    out_ptr = np.zeros(N + 1, dtype=np.int64)
+    np.cumsum(np.bincount(src, minlength=N), out=out_ptr[1:])
+
+    # 按目标节点稳定排序得到前驱索引，行内源节点编号保持升序
+    order = np.argsort(dst, kind='stable')
+    in_ptr = np.zeros(N + 1, dtype=np.int64)
+    np.cumsum(np.bincount(dst, minlength=N), out=in_ptr[1:])
+
+    return WordGraph(words,
+                     _to_array('q', out_ptr), _to_array('i', dst), _to_array('i', weights),
+                     _to_array('q', in_ptr), _to_array('i', src[order]),
+                     _to_array('i', weights[order]), index=index)
+
+
+class BulkGraphBuilder:
+    """分批接收单词序列，用 NumPy 统计相邻单词对
+
+    每批单词只做一次编号映射，相邻编号打包成 64 位整数后用 np.unique
+    计数。上一批的最后一个单词会与下一批的第一个单词连成边，因此分批
+    输入与一次性输入得到的图完全相同。各批的计数结果累积到一定规模后
+    合并压缩，内存占用只与边数有关，与文本长度无关。
+    """
+
+    def __init__(self):
+        self.index = {}
+        self.last = None      # 上一批最后一个单词的编号
+        self.parts = []       # 尚未合并的 (边编码, 权重)
+        self.pending = 0      # parts 中的总条目数
+        self.merged = 0       # 上次合并后的边数
+
+    def add_words(self, words):
+        """追加一批单词，与之前的单词首尾相接"""
+        import numpy as np
+
+        if not words:
+            return
+        index = self.index
+        # dict.fromkeys 保留单词首次出现的顺序，编号与 build_graph 一致
+        for w in dict.fromkeys(words):
+            if w not in index:
+                index[w] = len(index)
+        ids = np.fromiter(map(index.__getitem__, words), dtype=np.int64, count=len(words))
+        if self.last is not None:
+            ids = np.concatenate(([self.last], ids))
+        self.last = int(ids[-1])
+        if len(ids) < 2:
+            return
+
+        self.parts.append(np.unique((ids[:-1] << 32) | ids[1:], return_counts=True))
+        self.pending += len(self.parts[-1][0])
+        if self.pending > 2 * max(self.merged, 1 << 18):
+            self._compact()
+
+    def _compact(self):
+        if not self.parts:
+            # 少于两个单词的分片没有任何边
+            return
+        if len(self.parts) > 1:
+            self.parts = [_merge_counts(self.parts)]
+        self.merged = self.pending = len(self.parts[0][0])
+
+    def build(self):
+        if not self.parts:
+            return WordGraph()
+        self._compact()
+        keys, weights = self.parts[0]
+        return _graph_from_counts(list(self.index), self.index, keys, weights)
+
+
+def build_graph_bulk(words):
+    """向量化批量建图，结果与 build_graph 相同"""
+    builder = BulkGraphBuilder()
+    builder.add_words(words)
+    return builder.build()
+
+
+def extend_graph(graph, words):
+    """在已有图上追加一段单词序列的相邻单词对，返回新图
+
+    已有单词保持原编号，新单词依次排在后面；新图的 parent 记录原图的
+    哈希值，PageRankCache 据此用原图的结果作为新图的初始向量。
+    """
+    import numpy as np
+
+    builder = BulkGraphBuilder()
+    builder.index = dict(graph.index)
+    out_ptr, out_idx = _csr_arrays(graph)
+    if len(out_idx):
+        src = np.repeat(np.arange(len(graph), dtype=np.int64), np.diff(out_ptr))
+        weights = np.frombuffer(graph.out_w, dtype=np.int32).astype(np.int64)
+        builder.parts.append(((src << 32) | out_idx, weights))
+        builder.pending = builder.merged = len(out_idx)
+    builder.add_words(words)
+    extended = builder.build()
+    extended.parent = graph.fingerprint()
+    return extended
+
+
+def subgraph(graph, words, min_weight=1):
+    """由 words 及它们之间权重不低于 min_weight 的边构成的子图
+
+    子图中的单词保持在原图中的相对顺序，不在原图中的单词被忽略。
+    """
+    keep = sorted({graph.index[w] for w in words if w in graph.index})
+    new_id = dict(zip(keep, range(len(keep))))
+    out_ptr, out_idx, out_w = array('q', [0]), array('i'), array('i')
+    for u in keep:
+        for k in range(graph.out_ptr[u], graph.out_ptr[u + 1]):
+            v = new_id.get(graph.out_idx[k])
+            # 编号映射保持单调，每行仍按升序排列
+            if v is not None and graph.out_w[k] >= min_weight:
+                out_idx.append(v)
+                out_w.append(graph.out_w[k])
+        out_ptr.append(len(out_idx))
+    return WordGraph([graph.words[u] for u in keep], out_ptr, out_idx, out_w)
+
+
+def top_nodes(graph, k, scores=None):
+    """得分最高的 k 个单词，scores 为 {单词: 得分}，省略时按入度与出度之和"""
+    if scores is None:
+        degree = [graph.out_ptr[i + 1] - graph.out_ptr[i] + graph.in_ptr[i + 1] - graph.in_ptr[i]
+                  for i in range(len(graph))]
+        best = heapq.nlargest(k, range(len(graph)), key=degree.__getitem__)
+        return [graph.words[i] for i in best]
+    return heapq.nlargest(k, graph.words, key=scores.__getitem__)
+
+
+def ego_nodes(graph, centers, radius=1, limit=None):
+    """centers 沿出边和入边 radius 步以内的所有单词（按距离由近到远）
+
+    limit 不为 None 时最多返回 limit 个单词，距离远的先被舍弃。
+    """
+    seen = {graph.index[w] for w in centers if w in graph.index}
+    order = sorted(seen)
+    n_centers = len(order)
+    frontier = list(order)
+    for _ in range(radius):
+        if limit is not None and len(order) >= limit:
+            break
+        nxt = []
+        for u in frontier:
+            for ptr, idx in ((graph.out_ptr, graph.out_idx), (graph.in_ptr, graph.in_idx)):
+                for v in idx[ptr[u]:ptr[u + 1]]:
+                    if v not in seen:
+                        seen.add(v)
+                        nxt.append(v)
+        order.extend(nxt)
+        frontier = nxt
+    if limit is not None:
+        order = order[:max(limit, n_centers)]   # 中心单词总是保留
+    return [graph.words[u] for u in order]
+
+
+_WORD_TAIL = re.compile(r'\w+$')
+
+
+def _iter_chunk_words(chunks):
+    """把文本块序列切分为单词列表序列
+
+    块末尾可能截断的单词会留到下一块开头再切分，切分结果与
+    preprocess_text(全部文本) 一致。
+    """
+    carry = ''
+    for chunk in chunks:
+        text = carry + chunk
+        tail = _WORD_TAIL.search(text)
+        cut = tail.start() if tail else len(text)
+        carry = text[cut:]
+        words = preprocess_text(text[:cut])
+        if words:
+            yield words
+    if carry:
+        yield preprocess_text(carry)
+
+
+def iter_file_words(path, chunk_size=1 << 20, encoding='utf-8'):
+    """按固定大小分块读取文件，逐块产出预处理后的单词列表"""
+    with open(path, 'r', encoding=encoding) as f:
+        yield from _iter_chunk_words(iter(lambda: f.read(chunk_size), ''))
+
+
+def build_graph_from_file(path, chunk_size=1 << 20, encoding='utf-8', progress=None):
+    """流式读取文本文件并建图，峰值内存取决于图的规模而非文件大小
+
+    progress 不为 None 时，每处理完一块调用 progress(已处理的单词数)。
+    """
+    builder = BulkGraphBuilder()
+    count = 0
+    for words in iter_file_words(path, chunk_size, encoding):
+        builder.add_words(words)
+        count += len(words)
+        if progress is not None:
+            progress(count)
+    return builder.build()
+
+
+def _read_byte_range(path, start, end, chunk_size, encoding):
+    """逐块读取并解码文件的 [start, end) 字节区间"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            data = f.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield decoder.decode(data, final=remaining <= 0)
+
+
+def _count_shard(path, start, end, chunk_size, encoding):
+    """子进程任务：统计一个分片内的相邻单词对
+
+    返回 (分片内单词表, 边编码, 权重, 最后一个单词的分片内编号)，
+    编号只在分片内部有效，由主进程统一映射。
+    """
+    builder = BulkGraphBuilder()
+    for words in _iter_chunk_words(_read_byte_range(path, start, end, chunk_size, encoding)):
+        builder.add_words(words)
+    builder._compact()
+    keys, counts = builder.parts[0] if builder.parts else ((), ())
+    return list(builder.index), keys, counts, builder.last
+
+
+def _shard_bounds(path, shards):
+    """把文件切成大致相等的字节区间，切分点对齐到 ASCII 空白字符
+
+    UTF-8 多字节字符中不会出现 ASCII 字节，且空白一定是单词分隔符，
+    因此在空白处切分既不会截断字符也不会截断单词。
+    """
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, 'rb') as f:
+        for i in range(1, shards):
+            pos = max(size * i // shards, bounds[-1])
+            f.seek(pos)
+            while pos < size:
+                block = f.read(1 << 16)
+                if not block:
+                    pos = size
+                    break
+                hits = [k for k in (block.find(c) for c in b' \n\r\t') if k >= 0]
+                if hits:
+                    pos += min(hits)
+                    break
+                pos += len(block)
+            bounds.append(pos)
+    bounds.append(size)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def build_graph_parallel(path, workers=None, shards=None, chunk_size=1 << 20,
+                         encoding='utf-8'):
+    """多进程建图，结果与 build_graph_from_file 完全相同
+
+    文件按字节区间分片，各进程独立分词并统计相邻单词对；主进程按分片
+    顺序合并单词表（保持首次出现顺序），补上相邻分片交界处的那条边，
+    再合并所有分片的边计数。encoding 须兼容 ASCII（如 UTF-8）。
+    """
+    import numpy as np
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    bounds = _shard_bounds(path, shards or workers)
+    if workers == 1 or len(bounds) <= 1:
+        return build_graph_from_file(path, chunk_size, encoding)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_count_shard, path, a, b, chunk_size, encoding)
+                   for a, b in bounds]
+        index = {}
+        parts = []
+        prev_last = None
+        for future in futures:
+            words, keys, counts, last = future.result()
+            if not words:
+                continue
+            remap = np.fromiter((index.setdefault(w, len(index)) for w in words),
+                                dtype=np.int64, count=len(words))
+            if len(keys):
+                parts.append(((remap[keys >> 32] << 32) | remap[keys & 0xFFFFFFFF], counts))
+            # 上一分片的最后一个单词与本分片的第一个单词相邻
+            if prev_last is not None:
+                parts.append((np.array([(prev_last << 32) | int(remap[0])], dtype=np.int64),
+                              np.ones(1, dtype=np.int64)))
+            prev_last = int(remap[last])
+
+    if not parts:
+        return WordGraph()
+    keys, weights = _merge_counts(parts)
+    return _graph_from_counts(list(index), index, keys, weights)
+
+
+def find_bridge_words_for_pair(graph, word1, word2):
+    """返回所有满足 word1 -> word3 -> word2 的桥接词 word3"""
+    a = graph.index.get(word1)
+    b = graph.index.get(word2)
+    if a is None or b is None:
+        return []
+
+    out_ptr, out_idx = graph.out_ptr, graph.out_idx
+    bridges = []
+    for k in range(out_ptr[a], out_ptr[a + 1]):
+        c = out_idx[k]
+        if graph.edge_slot(c, b) >= 0:
+            bridges.append(graph.words[c])
+    return bridges
+
+
+class BridgeIndex:
+    """桥接词索引 (word1, word2) -> 按编号排序的桥接词列表
+
+    未缓存的单词对取 word1 的后继与 word2 的前驱中较短的一侧，逐个在
+    另一侧的有序数组里二分查找，结果按单词对放入 LRU 缓存。
+    eager=True 时在创建时用 bridge_table 预先计算编号靠前的 word1 的
+    全部桥接词，直到达到内存上限。max_entries 限制预计算表与 LRU 缓存中
+    桥接词的总条数。
+    """
+
+    def __init__(self, graph, eager=False, max_entries=2_000_000):
+        self.graph = graph
+        self.max_entries = max_entries
+        self.table = None           # 预计算的 BridgeTable，覆盖编号 < table_limit 的 word1
+        self.table_limit = 0
+        self.pairs = OrderedDict()  # (word1 << 32) | word2 -> [桥接词编号]
+        self.entries = 0
+        if eager and len(graph):
+            self._precompute()
+
+    def _precompute(self):
+        import numpy as np
+
+        triples = np.cumsum(_two_hop_sizes(self.graph))
+        limit = int(np.searchsorted(triples, self.max_entries, side='right'))
+        if limit:
+            self.table = bridge_table(self.graph, range(limit))
+            self.table_limit = limit
+            self.entries = len(self.table.bridges)
+
+    def _compute(self, a, b):
+        g = self.graph
+        lo_a, hi_a = g.out_ptr[a], g.out_ptr[a + 1]
+        lo_b, hi_b = g.in_ptr[b], g.in_ptr[b + 1]
+        bridges = []
+        if hi_a - lo_a <= hi_b - lo_b:
+            # 后继较少：检查每个后继 c 是否是 b 的前驱
+            in_idx = g.in_idx
+            for c in g.out_idx[lo_a:hi_a]:
+                k = bisect.bisect_left(in_idx, c, lo_b, hi_b)
+                if k < hi_b and in_idx[k] == c:
+                    bridges.append(c)
+        else:
+            out_idx = g.out_idx
+            for c in g.in_idx[lo_b:hi_b]:
+                k = bisect.bisect_left(out_idx, c, lo_a, hi_a)
+                if k < hi_a and out_idx[k] == c:
+                    bridges.append(c)
+        return bridges
+
+    def _lookup(self, a, b):
+        if a < self.table_limit:
+            return self.table.bridge_ids(a, b)
+
+        key = (a << 32) | b
+        bridges = self.pairs.get(key)
+        if bridges is not None:
+            self.pairs.move_to_end(key)
+            return bridges
+
+        bridges = self._compute(a, b)
+        self.pairs[key] = bridges
+        self.entries += len(bridges) + 1
+        while self.entries > self.max_entries and self.pairs:
+            _, old = self.pairs.popitem(last=False)
+            self.entries -= len(old) + 1
+        return bridges
+
+    def lookup(self, word1, word2):
+        """返回 word1 到 word2 的桥接词列表"""
+        index = self.graph.index
+        a = index.get(word1)
+        b = index.get(word2)
+        if a is None or b is None:
+            return []
+        return [self.graph.words[c] for c in self._lookup(a, b)]
+
+    def batch(self, pairs):
+        """批量查询，返回与 pairs 一一对应的桥接词列表"""
+        index, words = self.graph.index, self.graph.words
+        results = []
+        for word1, word2 in pairs:
+            a = index.get(word1)
+            b = index.get(word2)
+            if a is None or b is None:
+                results.append([])
+            else:
+                results.append([words[c] for c in self._lookup(a, b)])
+        return results
+
+
+def _csr_arrays(graph):
+    """以 NumPy 数组视图（不复制）返回 CSR 的 out_ptr、out_idx"""
+    import numpy as np
+
+    return (np.frombuffer(graph.out_ptr, dtype=np.int64),
+            np.frombuffer(graph.out_idx, dtype=np.int32))
+
+
+def _two_hop_sizes(graph):
+    """每个节点出发的两步路径数，即 A·A 对应行的元素之和"""
+    import numpy as np
+
+    out_ptr, out_idx = _csr_arrays(graph)
+    degree = np.diff(out_ptr)
+    src = np.repeat(np.arange(len(graph)), degree)
+    return np.bincount(src, weights=degree[out_idx], minlength=len(graph)).astype(np.int64)
+
+
+def _expand_rows(out_ptr, out_idx, nodes):
+    """展开 nodes 中每个节点的 CSR 行，返回 (元素所属的 nodes 下标, 行内节点)"""
+    import numpy as np
+
+    starts = out_ptr[nodes]
+    lengths = out_ptr[nodes + 1] - starts
+    owner = np.repeat(np.arange(len(nodes)), lengths)
+    offsets = np.cumsum(lengths) - lengths
+    positions = starts[owner] + np.arange(len(owner)) - offsets[owner]
+    return owner, out_idx[positions]
+
+
+class BridgeTable:
+    """邻接矩阵平方 A·A 的若干行
+
+    对每个源节点，按目标编号升序记录两步可达的 word2、桥接词数量
+    （即 A·A 中对应元素）以及桥接词本身，均以扁平数组存储：
+    源节点 sources[i] 的目标为 dst[row_ptr[i]:row_ptr[i+1]]，
+    第 j 个目标的桥接词为 bridges[bridge_ptr[j]:bridge_ptr[j+1]]。
+    """
+
+    def __init__(self, graph, sources, row_ptr, dst, bridge_ptr, bridges):
+        self.graph = graph
+        self.sources = sources
+        self.row_ptr = row_ptr
+        self.dst = dst
+        self.bridge_ptr = bridge_ptr
+        self.bridges = bridges
+
+    def __len__(self):
+        return len(self.dst)
+
+    @property
+    def counts(self):
+        """每个 (word1, word2) 的桥接词数量"""
+        import numpy as np
+
+        return np.diff(self.bridge_ptr)
+
+    def _slot(self, a, b):
+        i = self.sources.searchsorted(a)
+        if i == len(self.sources) or self.sources[i] != a:
+            return -1
+        lo, hi = self.row_ptr[i], self.row_ptr[i + 1]
+        j = lo + self.dst[lo:hi].searchsorted(b)
+        if j < hi and self.dst[j] == b:
+            return j
+        return -1
+
+    def bridge_ids(self, a, b):
+        """返回编号 a 到编号 b 的桥接词编号列表"""
+        j = self._slot(a, b)
+        if j < 0:
+            return []
+        return self.bridges[self.bridge_ptr[j]:self.bridge_ptr[j + 1]].tolist()
+
+    def lookup(self, word1, word2):
+        a = self.graph.index.get(word1)
+        b = self.graph.index.get(word2)
+        if a is None or b is None:
+            return []
+        return [self.graph.words[c] for c in self.bridge_ids(a, b)]
+
+    def count(self, word1, word2):
+        return len(self.lookup(word1, word2))
+
+    def items(self):
+        """按 (word1, word2) 顺序遍历 (word1, word2, 桥接词列表)"""
+        words = self.graph.words
+        sources = self.sources.tolist()
+        row_ptr = self.row_ptr.tolist()
+        dst = self.dst.tolist()
+        bridge_ptr = self.bridge_ptr.tolist()
+        bridges = self.bridges.tolist()
+        for i, a in enumerate(sources):
+            for j in range(row_ptr[i], row_ptr[i + 1]):
+                yield (words[a], words[dst[j]],
+                       [words[c] for c in bridges[bridge_ptr[j]:bridge_ptr[j + 1]]])
+
+
+def bridge_table(graph, sources=None, block_triples=1 << 22):
+    """用稀疏矩阵乘法 A·A 批量计算桥接词
+
+    sources 为源节点编号（默认全部节点）。每个源节点的后继行展开一次，
+    再展开这些后继的后继行，得到所有 (word1, 桥接词, word2) 三元组，
+    按 (word1, word2) 稳定排序后即为 A·A 的对应行，桥接词保持编号升序。
+    源节点按三元组数量分块处理，每块不超过 block_triples 个三元组。
+    """
+    import numpy as np
+
+    out_ptr, out_idx = _csr_arrays(graph)
+    if sources is None:
+        sources = np.arange(len(graph), dtype=np.int64)
+    else:
+        sources = np.unique(np.asarray(sources, dtype=np.int64))
+    sizes = _two_hop_sizes(graph)[sources]
+
+    row_counts, dst_parts, bridge_counts, bridge_parts = [], [], [], []
+    start = 0
+    while start < len(sources):
+        # 至少放入一个源节点，避免单行超过 block_triples 时死循环
+        total = np.cumsum(sizes[start:])
+        stop = start + max(1, int(np.searchsorted(total, block_triples, side='right')))
+        block = sources[start:stop]
+        start = stop
+
+        owner1, mid = _expand_rows(out_ptr, out_idx, block)
+        owner2, dst = _expand_rows(out_ptr, out_idx, mid)
+        src = owner1[owner2]
+        mid = mid[owner2]
+        key = (src << 32) | dst
+        order = np.argsort(key, kind='stable')
+        key = key[order]
+
+        # 每个 (word1, word2) 在排序后第一次出现的位置
+        first = np.flatnonzero(np.diff(key, prepend=-1))
+        pair_src = key[first] >> 32
+        row_counts.append(np.bincount(pair_src, minlength=len(block)))
+        dst_parts.append((key[first] & 0xFFFFFFFF).astype(np.int32))
+        bridge_counts.append(np.diff(np.r_[first, len(key)]))
+        bridge_parts.append(mid[order])
+
+    def concat(parts, dtype):
+        return np.concatenate(parts).astype(dtype) if parts else np.zeros(0, dtype=dtype)
+
+    row_ptr = np.zeros(len(sources) + 1, dtype=np.int64)
+    np.cumsum(concat(row_counts, np.int64), out=row_ptr[1:])
+    bridge_ptr = np.zeros(int(row_ptr[-1]) + 1, dtype=np.int64)
+    np.cumsum(concat(bridge_counts, np.int64), out=bridge_ptr[1:])
+    return BridgeTable(graph, sources, row_ptr, concat(dst_parts, np.int32),
+                       bridge_ptr, concat(bridge_parts, np.int32))
+
+
+def insert_bridge_words(graph, text, rng=random, index=None):
+    """在新文本相邻单词之间随机插入一个桥接词，保持原单词格式
+
+    index 为 BridgeIndex 时复用其缓存，否则为本次调用临时创建一个。
+    """
+    if index is None:
+        index = BridgeIndex(graph)
+    original_words = text.split()
+    lowered = [w.lower() for w in original_words]
+    all_bridges = index.batch(list(zip(lowered, lowered[1:])))
+
+    result = []
+    for i, word in enumerate(original_words):
+        result.append(word)
+        if i < len(original_words) - 1 and all_bridges[i]:
+            result.append(rng.choice(all_bridges[i]))
+    return ' '.join(result)
+
+
+PROGRESS_EVERY = 2048   # Dijkstra 每确定这么多个节点报告一次进度
+
+
+def shortest_path_dag(graph, s, t=None, progress=None):
+    """二叉堆 Dijkstra（按编号计算）
+
+    返回 (dist, preds, settled) 三个以编号为下标的列表：dist 为距离（-1
+    表示未到达），preds 为所有最短路径上的前驱编号列表，settled 标记已
+    确定最短距离的节点。给定终点 t 时在 t 出堆后立即停止；此时 t 的全部
+    最短路径前驱都已确定，因为边权均为正，它们的距离严格小于 dist[t]。
+    progress 不为 None 时，每确定 PROGRESS_EVERY 个节点调用一次
+    progress(已确定的节点数)。
+    """
+    out_ptr, out_idx, out_w = graph.out_ptr, graph.out_idx, graph.out_w
+    N = len(graph)
+    dist = [-1] * N
+    preds = [None] * N
+    settled = bytearray(N)
+    dist[s] = 0
+    preds[s] = []
+    heap = [(0, s)]
+    heappop, heappush = heapq.heappop, heapq.heappush
+    count = 0
+    while heap:
+        d, u = heappop(heap)
+        if settled[u]:
+            continue
+        settled[u] = 1
+        if u == t:
+            break
+        count += 1
+        if progress is not None and count % PROGRESS_EVERY == 0:
+            progress(count)
+        for k in range(out_ptr[u], out_ptr[u + 1]):
+            v = out_idx[k]
+            nd = d + out_w[k]
+            old = dist[v]
+            if old < 0 or nd < old:
+                dist[v] = nd
+                preds[v] = [u]
+                heappush(heap, (nd, v))
+            elif nd == old:
+                preds[v].append(u)
+    return dist, preds, settled
+
+
+def dijkstra(graph, source, target=None):
+    """单源最短路径
+
+    返回 (dist, preds)：dist 为已确定最短距离的节点的距离，preds 记录
+    每个节点在所有最短路径上的前驱，用于还原全部最短路径。给定 target
+    时到达 target 即停止，结果只包含已确定的节点。
+    """
+    s = graph.index[source]
+    t = graph.index.get(target) if target is not None else None
+    dist, preds, settled = shortest_path_dag(graph, s, t)
+    words = graph.words
+    reached = [v for v in range(len(graph)) if settled[v]]
+    return ({words[v]: dist[v] for v in reached},
+            {words[v]: [words[p] for p in preds[v]] for v in reached})
+
+
+def count_shortest_paths(dist, preds, s, t):
+    """在 O(V+E) 时间内统计 s 到 t 的最短路径条数（t 未到达时为 0）
+
+    只考虑前驱图中能到达 t 的节点，按距离从小到大递推
+    count[v] = sum(count[p] for p in preds[v])。
+    """
+    if preds[t] is None:
+        return 0
+    seen = {t}
+    stack = [t]
+    while stack:
+        for p in preds[stack.pop()]:
+            if p not in seen:
+                seen.add(p)
+                stack.append(p)
+
+    count = {}
+    for v in sorted(seen, key=dist.__getitem__):
+        count[v] = 1 if v == s else sum(count[p] for p in preds[v])
+    return count[t]
+
+
+def iter_shortest_paths(preds, s, t):
+    """按需逐条生成 s 到 t 的最短路径（编号列表），不使用递归
+
+    用显式栈在前驱图上做深度优先遍历，每个栈帧记录下一个要尝试的
+    前驱；前驱图中的每个节点都能回到 s，因此不会走进死路。
+    """
+    if preds[t] is None:
+        return
+    stack = [[t, 0]]
+    while stack:
+        frame = stack[-1]
+        node, i = frame
+        if node == s:
+            yield [v for v, _ in reversed(stack)]
+            stack.pop()
+        elif i < len(preds[node]):
+            frame[1] = i + 1
+            stack.append([preds[node][i], 0])
+        else:
+            stack.pop()
+
+
+def all_shortest_paths(graph, source, target, limit=None, progress=None):
+    """返回 (长度, 最短路径总数, 路径列表)
+
+    路径列表最多包含 limit 条（None 表示全部）；不可达时返回 (None, 0, [])。
+    progress 的含义同 shortest_path_dag。
+    """
+    s = graph.index[source]
+    t = graph.index[target]
+    dist, preds, settled = shortest_path_dag(graph, s, t, progress)
+    if not settled[t]:
+        return None, 0, []
+    words = graph.words
+    total = count_shortest_paths(dist, preds, s, t)
+    paths = itertools.islice(iter_shortest_paths(preds, s, t), limit)
+    return dist[t], total, [[words[v] for v in path] for path in paths]
+
+
+def single_source_shortest_paths(graph, source, table=None, progress=None):
+    """返回 {终点: (长度, 一条最短路径)}，不含起点本身
+
+    给定 DistanceTable 时直接查表，不再运行 Dijkstra。
+    """
+    if table is not None:
+        return table.single_source(source)
+    s = graph.index[source]
+    dist, preds, settled = shortest_path_dag(graph, s, progress=progress)
+    words = graph.words
+    result = {}
+    for v in range(len(graph)):
+        if not settled[v] or v == s:
+            continue
+        path = [v]
+        while path[-1] != s:
+            path.append(preds[path[-1]][0])
+        result[words[v]] = (dist[v], [words[u] for u in reversed(path)])
+    return result
+
+
+_table_graph = None   # 全源最短路径子进程中使用的图
+
+
+def _init_distance_worker(graph):
+    global _table_graph
+    _table_graph = graph
+
+
+def _distance_bound(graph):
+    """最短距离的上界
+
+    最短路径是简单路径，路径上每个节点至多经过一条自己的出边，因此
+    距离不超过各节点最大出边权重之和；比所有边权之和紧得多。
+    """
+    out_ptr, out_w = graph.out_ptr, graph.out_w
+    return sum(max(out_w[out_ptr[v]:out_ptr[v + 1]], default=0) for v in range(len(graph)))
+
+
+def _distance_rows(start, stop, dist_dtype, pred_dtype):
+    """子进程任务：计算源节点 [start, stop) 的距离行与前驱行及其中最大的有限距离"""
+    import numpy as np
+
+    graph = _table_graph
+    N = len(graph)
+    no_dist = np.iinfo(dist_dtype).max
+    no_pred = np.iinfo(pred_dtype).max
+    dist_rows = np.full((stop - start, N), no_dist, dtype=dist_dtype)
+    pred_rows = np.full((stop - start, N), no_pred, dtype=pred_dtype)
+    longest = 0
+    for i, s in enumerate(range(start, stop)):
+        dist, preds, settled = shortest_path_dag(graph, s)
+        reached = [v for v in range(N) if settled[v] and v != s]
+        dist_rows[i, s] = 0
+        dist_rows[i, reached] = [dist[v] for v in reached]
+        pred_rows[i, reached] = [preds[v][0] for v in reached]
+        longest = max(longest, max((dist[v] for v in reached), default=0))
+    return start, dist_rows, pred_rows, longest
+
+
+class DistanceTable:
+    """全源最短路径表
+
+    dist[s, t] 为 s 到 t 的最短距离，pred[s, t] 为该最短路径上 t 的前一个
+    节点（与 single_source_shortest_paths 选取的路径相同），不可达时两者
+    都是对应整数类型的最大值。按前驱而非后继存储，还原一条路径只需读取
+    第 s 行，配合内存映射文件时只会载入用到的行。
+    """
+
+    def __init__(self, graph, dist, pred):
+        self.graph = graph
+        self.dist = dist
+        self.pred = pred
+        import numpy as np
+
+        self.no_dist = int(np.iinfo(dist.dtype).max)
+        self.no_pred = int(np.iinfo(pred.dtype).max)
+
+    def _path(self, pred_row, s, t):
+        path = [t]
+        while path[-1] != s:
+            path.append(pred_row[path[-1]])
+        words = self.graph.words
+        return [words[v] for v in reversed(path)]
+
+    def distance(self, word1, word2):
+        """返回最短距离，不可达时返回 None"""
+        d = int(self.dist[self.graph.index[word1], self.graph.index[word2]])
+        return None if d == self.no_dist else d
+
+    def path(self, word1, word2):
+        """返回一条最短路径，不可达时返回 None"""
+        s, t = self.graph.index[word1], self.graph.index[word2]
+        if self.dist[s, t] == self.no_dist:
+            return None
+        return self._path(self.pred[s].tolist(), s, t)
+
+    def single_source(self, source):
+        """与 single_source_shortest_paths 的返回格式相同"""
+        s = self.graph.index[source]
+        dist_row = self.dist[s].tolist()
+        pred_row = self.pred[s].tolist()
+        words = self.graph.words
+        return {words[t]: (dist_row[t], self._path(pred_row, s, t))
+                for t in range(len(self.graph))
+                if t != s and dist_row[t] != self.no_dist}
+
+
+MAX_TABLE_BYTES = 2 << 30   # 全源最短路径表（距离与前驱两个 N×N 矩阵）的大小上限
+
+
+def distance_table_bytes(graph):
+    """全源最短路径表计算期间占用的字节数（按计算时的整数类型估计）"""
+    N = len(graph)
+    dist_size = 2 if _distance_bound(graph) < 0xFFFF else 4
+    pred_size = 2 if N < 0xFFFF else 4
+    return N * N * (dist_size + pred_size)
+
+
+def distance_table(graph, cache_dir=None, workers=None, block=32, progress=None,
+                   max_bytes=MAX_TABLE_BYTES):
+    """计算或加载全源最短路径表
+
+    各源节点的 Dijkstra 分块交给进程池并行计算。给定 cache_dir 时结果
+    以 .npy 文件保存，文件名为图的哈希值；再次加载同一语料时直接以
+    内存映射方式打开，不再重新计算。距离上界（见 _distance_bound）在
+    uint16 范围内时直接用 uint16 计算；否则先用 uint32 计算，实际最大
+    距离仍在 uint16 范围内时再压缩为 uint16。前驱编号按节点数选择。
+    progress 不为 None 时每收到一块结果调用 progress(已完成的源节点数, N)；
+    progress 抛出异常（如任务被取消）时关闭进程池并删除未完成的临时文件。
+    需要新建的表超过 max_bytes（None 表示不限制）时抛出 ValueError。
+    """
+    import numpy as np
+    from concurrent.futures import ProcessPoolExecutor
+
+    N = len(graph)
+    dist_dtype = np.uint16 if _distance_bound(graph) < 0xFFFF else np.uint32
+    pred_dtype = np.uint16 if N < 0xFFFF else np.uint32
+
+    if cache_dir is not None:
+        base = os.path.join(cache_dir, graph.fingerprint())
+        dist_file, pred_file = base + '.dist.npy', base + '.pred.npy'
+        if os.path.exists(dist_file) and os.path.exists(pred_file):
+            return DistanceTable(graph, np.load(dist_file, mmap_mode='r'),
+                                 np.load(pred_file, mmap_mode='r'))
+
+    size = distance_table_bytes(graph)
+    if max_bytes is not None and size > max_bytes:
+        raise ValueError(f"全源最短路径表需要 {size / 2 ** 20:.0f} MB，"
+                         f"超过上限 {max_bytes / 2 ** 20:.0f} MB")
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        # 先写入临时文件，全部完成后再改名，避免留下不完整的缓存
+        dist = np.lib.format.open_memmap(dist_file + '.tmp', 'w+', dist_dtype, (N, N))
+        pred = np.lib.format.open_memmap(pred_file + '.tmp', 'w+', pred_dtype, (N, N))
+    else:
+        dist = np.empty((N, N), dtype=dist_dtype)
+        pred = np.empty((N, N), dtype=pred_dtype)
+
+    blocks = [(a, min(a + block, N), dist_dtype, pred_dtype) for a in range(0, N, block)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_distance_worker(graph)
+        results = (_distance_rows(*args) for args in blocks)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_distance_worker,
+                                   initargs=(graph,))
+        results = pool.map(_distance_rows, *zip(*blocks)) if blocks else ()
+    try:
+        done = longest = 0
+        for start, dist_rows, pred_rows, block_longest in results:
+            dist[start:start + len(dist_rows)] = dist_rows
+            pred[start:start + len(pred_rows)] = pred_rows
+            longest = max(longest, block_longest)
+            done += len(dist_rows)
+            if progress is not None:
+                progress(done, N)
+    except BaseException:
+        if pool is not None:
+            # 丢弃尚未开始的块，只等待正在计算的块结束
+            pool.shutdown(cancel_futures=True)
+            pool = None
+        if cache_dir is not None:
+            del dist, pred
+            for path in (dist_file, pred_file):
+                try:
+                    os.remove(path + '.tmp')
+                except OSError:
+                    pass
+        raise
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        _init_distance_worker(None)
+
+    if dist_dtype != np.uint16 and longest < 0xFFFF:
+        # 上界偏松：按实际最大距离压缩为 uint16，逐块转换以免整表复制
+        wide = dist
+        if cache_dir is not None:
+            dist = np.lib.format.open_memmap(dist_file + '.tmp16', 'w+', np.uint16, (N, N))
+        else:
+            dist = np.empty((N, N), dtype=np.uint16)
+        no_dist = np.iinfo(dist_dtype).max
+        for a in range(0, N, block):
+            rows = wide[a:a + block]
+            dist[a:a + block] = np.where(rows == no_dist, np.iinfo(np.uint16).max, rows)
+        del wide
+        if cache_dir is not None:
+            os.replace(dist_file + '.tmp16', dist_file + '.tmp')
+
+    if cache_dir is not None:
+        dist.flush()
+        pred.flush()
+        del dist, pred
+        os.replace(dist_file + '.tmp', dist_file)
+        os.replace(pred_file + '.tmp', pred_file)
+        return DistanceTable(graph, np.load(dist_file, mmap_mode='r'),
+                             np.load(pred_file, mmap_mode='r'))
+    return DistanceTable(graph, dist, pred)
+
+
+class TransitionMatrix:
+    """PageRank 的转移矩阵，按 CSC 顺序存储，只需构建一次
+
+    prob[k] 为第 k 条入边（源节点 src[k]）的转移概率：weighted 为 True 时
+    等于边权重除以源节点出边权重之和，否则等于 1 / 源节点出边数。出度为 0
+    的悬挂节点记录在 dangling 中，由调用方把它们的 PR 值平均分给所有节点。
+    """
+
+    def __init__(self, graph, weighted=False):
+        import numpy as np
+
+        self.N = N = len(graph)
+        self.weighted = weighted
+        out_ptr, out_idx = _csr_arrays(graph)
+        self.in_ptr = in_ptr = np.frombuffer(graph.in_ptr, dtype=np.int64)
+        self.src = np.frombuffer(graph.in_idx, dtype=np.int32)
+        if weighted:
+            out_w = np.frombuffer(graph.out_w, dtype=np.int32)
+            owner = np.repeat(np.arange(N), np.diff(out_ptr))
+            out_total = np.bincount(owner, weights=out_w, minlength=N)
+            in_w = np.frombuffer(graph.in_w, dtype=np.int32)
+            self.prob = in_w / out_total[self.src]
+        else:
+            out_total = np.diff(out_ptr).astype(np.float64)
+            self.prob = 1.0 / out_total[self.src]
+        self.dangling = np.flatnonzero(out_total == 0)
+        # np.add.reduceat 遇到空区间会取错值，只对有入边的节点分段求和
+        self.rows = np.flatnonzero(np.diff(in_ptr))
+        self.starts = in_ptr[self.rows]
+        # 装有 scipy 时改用其 CSR 乘法（CSC 的 Pᵀ 恰好是 CSR 的 P 转置），
+        # 对 N×K 矩阵比逐段 reduceat 快一个数量级
+        try:
+            import scipy.sparse
+        except ImportError:
+            self.csr = None
+        else:
+            self.csr = scipy.sparse.csr_matrix((self.prob, self.src, in_ptr), shape=(N, N))
+
+    def dot(self, x):
+        """返回 Pᵀx，x 可以是长度 N 的向量或 N×K 矩阵"""
+        import numpy as np
+
+        if self.csr is not None:
+            return self.csr @ x
+        prob = self.prob if x.ndim == 1 else self.prob[:, None]
+        result = np.zeros_like(x)
+        if len(self.rows):
+            result[self.rows] = np.add.reduceat(x[self.src] * prob, self.starts, axis=0)
+        return result
+
+
+class PageRankResult:
+    """PageRank 计算结果及收敛信息
+
+    residuals[i] 为第 i+1 轮迭代前后两个向量之差的 L1 范数；
+    converged 为 False 表示达到了 max_iter 上限仍未收敛。
+    """
+
+    def __init__(self, words, scores, residuals, converged, solver, warm_start=False):
+        self.words = words
+        self.scores = scores
+        self.residuals = residuals
+        self.converged = converged
+        self.solver = solver
+        self.warm_start = warm_start
+
+    @property
+    def iterations(self):
+        return len(self.residuals)
+
+    def as_dict(self):
+        return dict(zip(self.words, self.scores.tolist()))
+
+    def summary(self):
+        """一行收敛情况说明"""
+        state = "已收敛" if self.converged else "达到迭代上限，未收敛"
+        last = self.residuals[-1] if self.residuals else 0.0
+        start = "（以已有结果为初始向量）" if self.warm_start else ""
+        return f"求解器 {self.solver}{start}，迭代 {self.iterations} 轮，最终残差 {last:.3e}，{state}"
+
+    def residual_report(self):
+        """逐轮残差，每轮一行"""
+        return "\n".join(f"第 {i} 轮: {r:.3e}" for i, r in enumerate(self.residuals, 1))
+
+
+PAGERANK_SOLVERS = ('jacobi', 'gauss-seidel', 'aitken', 'quadratic')
+
+
+def pagerank_solvers():
+    """界面中提供的求解器：没有 scipy 时 Gauss-Seidel 只能逐节点计算，不提供"""
+    import importlib.util
+
+    if importlib.util.find_spec('scipy') is None:
+        return tuple(s for s in PAGERANK_SOLVERS if s != 'gauss-seidel')
+    return PAGERANK_SOLVERS
+
+
+def _aitken(x0, x1, x2):
+    """逐分量 Aitken Δ² 外推，分母接近 0 或结果为负的分量保持 x2"""
+    import numpy as np
+
+    denom = x2 - 2 * x1 + x0
+    safe = np.abs(denom) > 1e-15
+    result = x2.copy()
+    result[safe] = x0[safe] - (x1[safe] - x0[safe]) ** 2 / denom[safe]
+    bad = result <= 0
+    result[bad] = x2[bad]
+    return result
+
+
+def _quadratic(x0, x1, x2, x3):
+    """Kamvar 等人的二次外推：假设误差主要落在前两个次主特征向量上"""
+    import numpy as np
+
+    Y = np.column_stack((x1 - x0, x2 - x0))
+    gamma, *_ = np.linalg.lstsq(Y, -(x3 - x0), rcond=None)
+    g1, g2, g3 = float(gamma[0]), float(gamma[1]), 1.0
+    result = (g1 + g2 + g3) * x1 + (g2 + g3) * x2 + g3 * x3
+    if not np.all(np.isfinite(result)) or np.any(result <= 0):
+        return x3
+    return result
+
+
+def _gauss_seidel(matrix, x, d, max_iter, tol, progress=None):
+    """Gauss-Seidel 迭代：按编号顺序原地更新，每个节点使用前面节点的新值
+
+    把 Pᵀ 拆成严格下三角 L 与其余部分 U，每轮求解下三角方程组
+    (I - dL) x' = (1-d)/N + d(U x + 悬挂节点 PR 值之和 / N)，悬挂节点部分
+    取上一轮的值。I - dL 只分解一次（三角矩阵按自然顺序分解不产生填充），
+    之后每轮只是一次稀疏乘法和一次三角回代；没有 scipy 时逐节点更新。
+    """
+    import numpy as np
+
+    N = matrix.N
+    teleport = (1 - d) / N
+    if matrix.csr is not None:
+        import scipy.sparse
+        from scipy.sparse.linalg import splu
+
+        lower = scipy.sparse.tril(matrix.csr, k=-1, format='csc')
+        upper = scipy.sparse.triu(matrix.csr, k=0, format='csr')
+        solve = splu(scipy.sparse.identity(N, format='csc') - d * lower,
+                     permc_spec='NATURAL', diag_pivot_thresh=0).solve
+
+        def sweep(x):
+            return solve(teleport + d * (upper @ x + x[matrix.dangling].sum() / N))
+    else:
+        row_ptr = matrix.in_ptr.tolist()
+        src = matrix.src.tolist()
+        prob = matrix.prob.tolist()
+
+        def sweep(x):
+            rest = teleport + d * x[matrix.dangling].sum() / N
+            x = x.tolist()
+            for v in range(N):
+                incoming = 0.0
+                for k in range(row_ptr[v], row_ptr[v + 1]):
+                    incoming += x[src[k]] * prob[k]
+                x[v] = rest + d * incoming
+            return np.array(x)
+
+    residuals = []
+    for _ in range(max_iter):
+        new_x = sweep(x)
+        # 每轮归一化，消除沿主特征向量方向的误差，否则收敛反而比幂迭代慢
+        new_x /= new_x.sum()
+        diff = float(np.abs(new_x - x).sum())
+        x = new_x
+        residuals.append(diff)
+        if progress is not None:
+            progress(len(residuals), diff)
+        if diff < tol:
+            break
+    return x, residuals
+
+
+def pagerank_solve(graph, d=0.85, weighted=False, max_iter=100, tol=1e-6,
+                   solver='jacobi', x0=None, extrapolate_every=10, progress=None):
+    """计算 PageRank 并返回 PageRankResult
+
+    solver 可选：
+      jacobi        幂迭代，每轮一次稀疏矩阵向量乘
+      gauss-seidel  原地更新，每轮扫描所有节点，收敛所需轮数更少
+      aitken        幂迭代，每 extrapolate_every 轮做一次 Aitken Δ² 外推
+      quadratic     幂迭代，每 extrapolate_every 轮做一次二次外推
+    x0 为初始向量（默认均匀分布）。progress 不为 None 时每轮迭代后调用
+    progress(轮数, 残差)。
+    """
+    import numpy as np
+
+    if solver not in PAGERANK_SOLVERS:
+        raise ValueError(f"未知的求解器: {solver}")
+    N = len(graph)
+    if N == 0:
+        return PageRankResult([], np.zeros(0), [], True, solver)
+
+    matrix = TransitionMatrix(graph, weighted)
+    x = np.full(N, 1.0 / N) if x0 is None else np.asarray(x0, dtype=np.float64) / np.sum(x0)
+
+    if solver == 'gauss-seidel':
+        x, residuals = _gauss_seidel(matrix, x, d, max_iter, tol, progress)
+        converged = bool(residuals) and residuals[-1] < tol
+        return PageRankResult(graph.words, x, residuals, converged, solver, x0 is not None)
+
+    history = [x]
+    residuals = []
+    converged = False
+    for i in range(1, max_iter + 1):
+        dangling_sum = x[matrix.dangling].sum()
+        new_x = d * matrix.dot(x) + (1 - d) / N + d * dangling_sum / N
+        residuals.append(float(np.abs(new_x - x).sum()))
+        x = new_x
+        if progress is not None:
+            progress(i, residuals[-1])
+        if residuals[-1] < tol:
+            converged = True
+            break
+        history = (history + [x])[-4:]
+        if solver != 'jacobi' and i % extrapolate_every == 0:
+            if solver == 'aitken' and len(history) >= 3:
+                x = _aitken(*history[-3:])
+            elif solver == 'quadratic' and len(history) >= 4:
+                x = _quadratic(*history[-4:])
+            x = x / x.sum()
+            history = [x]
+
+    return PageRankResult(graph.words, x, residuals, converged, solver, x0 is not None)
+
+
+class PageRankCache:
+    """按图的哈希值与参数缓存 PageRank 结果
+
+    参数完全相同时直接返回缓存结果；否则从缓存中挑选同一张图（或其
+    extend_graph 的原图）上、加权方式相同且阻尼因子最接近的结果作为
+    初始向量，调节阻尼因子或追加少量边后只需很少几轮迭代即可收敛。
+    最多保留 max_entries 个结果，按最近最少使用淘汰。
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self.results = OrderedDict()   # (图哈希, weighted, d, solver, tol, max_iter) -> PageRankResult
+
+    def solve(self, graph, d=0.85, weighted=False, max_iter=100, tol=1e-6, solver='jacobi',
+              progress=None):
+        """与 pagerank_solve 参数相同，返回 PageRankResult"""
+        key = (graph.fingerprint(), weighted, d, solver, tol, max_iter)
+        result = self.results.get(key)
+        if result is not None:
+            self.results.move_to_end(key)
+            return result
+
+        result = pagerank_solve(graph, d, weighted, max_iter, tol, solver,
+                                x0=self._start_vector(graph, d, weighted), progress=progress)
+        self.results[key] = result
+        while len(self.results) > self.max_entries:
+            self.results.popitem(last=False)
+        return result
+
+    def _start_vector(self, graph, d, weighted):
+        import numpy as np
+
+        fingerprint = graph.fingerprint()
+        best, best_distance = None, None
+        for (f, w, dd, *_), result in self.results.items():
+            if w != weighted or f not in (fingerprint, graph.parent):
+                continue
+            # 优先使用同一张图上的结果
+            distance = abs(dd - d) + (0 if f == fingerprint else 1)
+            if best is None or distance < best_distance:
+                best, best_distance = result, distance
+        if best is None:
+            return None
+
+        N = len(graph)
+        x = best.scores
+        if len(x) < N:
+            # 新增节点编号排在后面，先给它们均匀的初始值
+            x = np.concatenate((x, np.full(N - len(x), 1.0 / N)))
+        return x
+
+
+class PageRankBatchResult:
+    """多组参数的 PageRank 结果表
+
+    scores[:, k] 为第 k 组配置下各单词的 PR 值；iterations[k] 与
+    converged[k] 为该组的迭代轮数及是否在上限内收敛。
+    """
+
+    def __init__(self, words, labels, scores, iterations, converged):
+        self.words = words
+        self.labels = labels
+        self.scores = scores
+        self.iterations = iterations
+        self.converged = converged
+
+    def column(self, k):
+        """第 k 组配置的 {单词: PR 值}"""
+        return dict(zip(self.words, self.scores[:, k].tolist()))
+
+    def as_dict(self):
+        """{单词: [各组配置的 PR 值]}"""
+        return dict(zip(self.words, self.scores.tolist()))
+
+    def top(self, k, n=10):
+        """第 k 组配置中 PR 值最高的 n 个 (单词, PR 值)"""
+        import numpy as np
+
+        column = self.scores[:, k]
+        order = np.argsort(-column, kind='stable')[:n]
+        return [(self.words[i], float(column[i])) for i in order]
+
+
+def _personalization_vector(graph, seeds):
+    """把种子词（列表或 {单词: 权重}）转换为和为 1 的向量，None 表示均匀分布"""
+    import numpy as np
+
+    N = len(graph)
+    if seeds is None:
+        return np.full(N, 1.0 / N)
+    if not isinstance(seeds, dict):
+        seeds = dict.fromkeys(seeds, 1.0)
+    v = np.zeros(N)
+    for word, weight in seeds.items():
+        if word not in graph.index:
+            raise ValueError(f"种子词 '{word}' 不在图中")
+        v[graph.index[word]] += weight
+    if v.sum() <= 0:
+        raise ValueError("种子词权重之和必须为正")
+    return v / v.sum()
+
+
+def pagerank_batch(graph, configs, weighted=False, max_iter=100, tol=1e-6, progress=None):
+    """一次求解多组 PageRank 配置
+
+    configs 为 (d, seeds) 列表，seeds 为 None（标准 PageRank）、种子词
+    列表或 {单词: 权重}（个性化 PageRank，随机跳转与悬挂节点的 PR 值都
+    按种子分布分配）。所有配置共用一个转移矩阵，以 N×K 矩阵同时迭代，
+    每轮只做一次稀疏矩阵乘法；已收敛的列不再参与后续迭代。progress 不为
+    None 时每轮调用 progress(轮数, 尚未收敛各列中的最大残差)。
+    """
+    import numpy as np
+
+    N, K = len(graph), len(configs)
+    labels = []
+    for d, seeds in configs:
+        label = f"d={d}"
+        if seeds:
+            label += " 种子=" + ",".join(seeds)
+        labels.append(label)
+    if N == 0 or K == 0:
+        return PageRankBatchResult(graph.words, labels, np.zeros((N, K)),
+                                   [0] * K, [True] * K)
+
+    matrix = TransitionMatrix(graph, weighted)
+    damping = np.array([d for d, _ in configs], dtype=np.float64)
+    V = np.column_stack([_personalization_vector(graph, seeds) for _, seeds in configs])
+    scores = np.full((N, K), 1.0 / N)
+    iterations = [max_iter] * K
+    converged = [False] * K
+
+    # 只保留仍在迭代的列，收敛的列写回 scores 后从 x / v / d 中移除
+    active = np.arange(K)
+    x, v, d = scores.copy(), V, damping
+    teleport = (1 - d) * v
+    for i in range(1, max_iter + 1):
+        new_x = matrix.dot(x)
+        new_x += x[matrix.dangling].sum(axis=0) * v
+        new_x *= d
+        new_x += teleport
+        residuals = np.abs(new_x - x).sum(axis=0)
+        x = new_x
+        if progress is not None:
+            progress(i, float(residuals.max()))
+        done = residuals < tol
+        if done.any():
+            scores[:, active[done]] = x[:, done]
+            for k in active[done].tolist():
+                iterations[k] = i
+                converged[k] = True
+            keep = ~done
+            active, x, v, d, teleport = active[keep], x[:, keep], v[:, keep], d[keep], teleport[:, keep]
+            if not len(active):
+                break
+    scores[:, active] = x
+
+    return PageRankBatchResult(graph.words, labels, scores, iterations, converged)
+
+
+def pagerank(graph, d=0.85, weighted=False, max_iter=100, tol=1e-6, solver='jacobi'):
+    """计算 PageRank 值，返回 {单词: PR 值}
+
+    weighted 为 True 时按边权重分配转移概率，否则按出边数量平均分配。
+    出度为 0 的悬挂节点将其 PR 值平均分给所有节点。转移矩阵只构建一次，
+    收敛条件为相邻两轮的 L1 残差小于 tol。需要收敛信息时使用 pagerank_solve。
+    """
+    return pagerank_solve(graph, d, weighted, max_iter, tol, solver).as_dict()
+
+
+def random_walk(graph, start=None, rng=random):
+    """随机游走生成器
+
+    每一步产出当前节点；遇到没有出边的节点时结束，第一次重复经过
+    某条边时结束并将该边作为生成器的返回值。
+    """
+    if len(graph) == 0:
+        return None
+    current = graph.index[start] if start is not None else rng.randrange(len(graph))
+    visited_edges = set()
+    while True:
+        yield graph.words[current]
+        lo, hi = graph.out_ptr[current], graph.out_ptr[current + 1]
+        if lo == hi:
+            return None
+        nxt = graph.out_idx[lo + rng.randrange(hi - lo)]
+        edge = (current, nxt)
+        if edge in visited_edges:
+            return graph.words[current], graph.words[nxt]
+        visited_edges.add(edge)
+        current = nxt
+
+
+class GraphListing:
+    """节点表与边表的排序、筛选
+
+    nodes() / edges() 只返回排好序的行号数组（节点编号或 out_idx 中的
+    边位置），界面按需取出可见的几行再调用 node_row() / edge_row() 格式化，
+    与图的规模无关。排序使用预先算好的名称序号和度数数组，均为向量化操作。
+    """
+
+    NODE_SORTS = ('name', 'degree', 'out', 'in')
+    EDGE_SORTS = ('weight', 'name')
+
+    def __init__(self, graph):
+        import numpy as np
+
+        self.graph = graph
+        N = len(graph)
+        out_ptr, self.dst = _csr_arrays(graph)
+        self.src = np.repeat(np.arange(N, dtype=np.int32), np.diff(out_ptr))
+        self.weight = np.frombuffer(graph.out_w, dtype=np.int32)
+        self.out_deg = np.diff(out_ptr)
+        self.in_deg = np.diff(np.frombuffer(graph.in_ptr, dtype=np.int64))
+        # rank[i] 为单词 i 在字母序中的位置
+        self.rank = np.empty(N, dtype=np.int64)
+        self.rank[sorted(range(N), key=graph.words.__getitem__)] = np.arange(N)
+
+    def _match(self, search):
+        import numpy as np
+
+        return np.fromiter((search in w for w in self.graph.words), dtype=bool,
+                           count=len(self.graph))
+
+    def nodes(self, sort='name', search=''):
+        """按 sort 排序（度数类为降序）、名称包含 search 的节点编号"""
+        import numpy as np
+
+        key = {'name': self.rank, 'degree': -(self.out_deg + self.in_deg),
+               'out': -self.out_deg, 'in': -self.in_deg}[sort]
+        ids = np.flatnonzero(self._match(search)) if search else np.arange(len(self.graph))
+        # 度数相同时按名称排序
+        return ids[np.lexsort((self.rank[ids], key[ids]))]
+
+    def edges(self, sort='weight', search=''):
+        """按 sort 排序（权重为降序）、任一端点包含 search 的边位置"""
+        import numpy as np
+
+        if search:
+            match = self._match(search)
+            slots = np.flatnonzero(match[self.src] | match[self.dst])
+        else:
+            slots = np.arange(len(self.dst))
+        src_rank, dst_rank = self.rank[self.src[slots]], self.rank[self.dst[slots]]
+        if sort == 'weight':
+            order = np.lexsort((dst_rank, src_rank, -self.weight[slots]))
+        else:
+            order = np.lexsort((dst_rank, src_rank))
+        return slots[order]
+
+    def node_row(self, i):
+        """(单词, 出度, 入度)"""
+        return self.graph.words[i], int(self.out_deg[i]), int(self.in_deg[i])
+
+    def edge_row(self, k):
+        """(源单词, 目标单词, 权重)"""
+        words = self.graph.words
+        return words[self.src[k]], words[self.dst[k]], int(self.weight[k])
@@ -0,0 +1,149 @@
+"""后台任务：在工作线程中建图、计算 PageRank 与最短路径，不阻塞 Tk 主线程
+
+计算函数通过 graph_engine 各函数的 progress 回调调用 Job.report 汇报进度，
+进度经 root.after 交回主线程显示在状态栏；取消后下一次 report 抛出
+JobCancelled，计算在最近的检查点结束。
+"""
+import threading
+import time
+import tkinter as tk
+from tkinter import messagebox
+
+PROGRESS_INTERVAL = 0.1   # 两次刷新状态栏之间的最小间隔（秒）
+CHUNK_SIZE = 64 * 1024    # 后台建图时每块读取的字符数，决定进度刷新的粒度
+
+
+class JobCancelled(Exception):
+    """任务已被取消，由 Job.report 在工作线程中抛出"""
+
+
+class Job:
+    """一个后台任务，work(job) 在工作线程中执行"""
+
+    def __init__(self, runner, name, widgets):
+        self.runner = runner
+        self.name = name
+        self.widgets = widgets
+        self.cancel_event = threading.Event()
+        self.last_report = 0.0
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def check(self):
+        """已取消时抛出 JobCancelled"""
+        if self.cancel_event.is_set():
+            raise JobCancelled(self.name)
+
+    def report(self, text):
+        """在工作线程中汇报进度，过于频繁的调用只做取消检查"""
+        self.check()
+        now = time.monotonic()
+        if now - self.last_report >= PROGRESS_INTERVAL:
+            self.last_report = now
+            self.runner.root.after(0, self.runner._progress, self, text)
+
+
+class JobRunner:
+    """管理后台任务
+
+    start(name, work, on_done, widgets) 在新线程中执行 work(job)，完成后在
+    主线程调用 on_done(result)，出错时调用 on_error(exception)（默认弹出
+    错误框）。任务运行期间只禁用 widgets 中的控件，结束后恢复原状态；
+    多个任务禁用同一控件时等全部结束才恢复。cancel_btn 在有任务运行时
+    可用，点击取消全部任务；被取消任务的结果直接丢弃。
+    """
+
+    def __init__(self, root, status_var, cancel_btn=None):
+        self.root = root
+        self.status_var = status_var
+        self.cancel_btn = cancel_btn
+        self.jobs = []
+        self.disabled = {}   # 控件 -> [禁用它的任务数, 原状态]
+        if cancel_btn is not None:
+            cancel_btn.config(command=self.cancel, state=tk.DISABLED)
+
+    def start(self, name, work, on_done, widgets=(), on_error=None):
+        job = Job(self, name, tuple(widgets))
+        self.jobs.append(job)
+        for widget in job.widgets:
+            entry = self.disabled.setdefault(widget, [0, str(widget.cget('state'))])
+            entry[0] += 1
+            widget.config(state=tk.DISABLED)
+        self._update_cancel()
+        self.status_var.set(f"{name}...")
+        threading.Thread(target=self._run, args=(job, work, on_done, on_error),
+                         daemon=True).start()
+        return job
+
+    def cancel(self, job=None):
+        """取消指定任务，job 为 None 时取消全部任务"""
+        for j in (self.jobs if job is None else [job]):
+            j.cancel()
+
+    def busy(self):
+        return bool(self.jobs)
+
+    def _run(self, job, work, on_done, on_error):
+        try:
+            result = work(job)
+        except JobCancelled:
+            self.root.after(0, self._finish, job, None, None)
+        except Exception as e:
+            self.root.after(0, self._finish, job, on_error or self._show_error(job), e)
+        else:
+            self.root.after(0, self._finish, job, on_done, result)
+
+    def _show_error(self, job):
+        def show(error):
+            messagebox.showerror("错误", f"{job.name}失败: {str(error)}")
+            self.status_var.set(f"{job.name}失败")
+        return show
+
+    def _progress(self, job, text):
+        if job in self.jobs and not job.cancelled:
+            self.status_var.set(f"{job.name}: {text}")
+
+    def _finish(self, job, callback, value):
+        self.jobs.remove(job)
+        for widget in job.widgets:
+            entry = self.disabled[widget]
+            entry[0] -= 1
+            if entry[0] == 0:
+                widget.config(state=entry[1])
+                del self.disabled[widget]
+        self._update_cancel()
+        if job.cancelled:
+            self.status_var.set(f"{job.name}已取消")
+        elif callback is not None:
+            callback(value)
+
+    def _update_cancel(self):
+        if self.cancel_btn is not None:
+            self.cancel_btn.config(state=tk.NORMAL if self.jobs else tk.DISABLED)
+
+
+# graph_engine 各函数 progress 回调的适配器，把进度格式化后交给 job.report
+
+def words_progress(job):
+    """build_graph_from_file：已读取的单词数"""
+    return lambda count: job.report(f"已读取 {count} 个单词")
+
+
+def settled_progress(job):
+    """Dijkstra：已确定最短距离的节点数"""
+    return lambda count: job.report(f"已确定 {count} 个节点")
+
+
+def sources_progress(job):
+    """全源最短路径表：已完成的源节点数"""
+    return lambda done, total: job.report(f"已完成 {done}/{total} 个源节点")
+
+
+def pagerank_progress(job):
+    """PageRank：迭代轮数与残差"""
+    return lambda iteration, residual: job.report(f"第 {iteration} 轮，残差 {residual:.2e}")
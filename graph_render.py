@@ -0,0 +1,632 @@
+"""图形渲染辅助模块
+
+app.py 与 app2.py 共用：布局坐标按 (图, 布局引擎) 缓存，Graphviz 只负责
+计算布局，节点和边直接画在 tk.Canvas 上——高亮路径和 PageRank 只修改
+已有图元的样式（LayoutView），平移缩放时借助网格索引只绘制视口内的
+部分（ViewportView），点击和悬停也通过同一索引定位节点；耗时的布局
+交给 RenderWorker 在后台线程执行。
+graphviz 与 numpy 都在用到的函数内导入。
+"""
+import os
+import math
+import shlex
+import hashlib
+import threading
+from collections import OrderedDict
+
+import graph_engine as ge
+
+LAYOUT_DPI = 72          # Graphviz plain 输出的坐标单位为英寸
+MAX_RENDER_NODES = 300   # 任何显示模式下最多绘制的节点数
+
+# 细节层次模式 -> 界面上显示的名称
+LOD_MODES = {
+    'full': '全图',
+    'pagerank': 'PageRank前K个',
+    'degree': '度数前K个',
+    'ego': '邻域',
+}
+
+
+def level_of_detail(graph, mode='full', k=100, min_weight=1, pagerank=None,
+                    centers=(), radius=1, keep=(), max_nodes=MAX_RENDER_NODES):
+    """按细节层次选出要绘制的子图
+
+    mode 为 'full'（全图）、'pagerank' / 'degree'（得分最高的 k 个单词）或
+    'ego'（centers 沿出入边 radius 步以内的邻域，keep 中的单词如高亮路径
+    总会保留）；min_weight 去掉权重更低的边。除 keep 外节点数不超过
+    max_nodes，全图超过上限时退化为按度数取前 max_nodes 个，因此绘制耗时
+    与语料大小无关。查询仍在完整的图上进行，这里只影响显示。
+    其他模式忽略 keep：节点集合不随高亮路径变化，布局缓存可以命中，
+    路径只高亮画面上已有的边。
+    """
+    k = min(k, max_nodes)
+    if mode == 'ego' and centers:
+        words = list(ge.ego_nodes(graph, centers, radius, limit=max_nodes)) + list(keep)
+    elif mode == 'pagerank' and pagerank:
+        words = ge.top_nodes(graph, k, pagerank)
+    elif mode != 'full':
+        words = ge.top_nodes(graph, k)
+    elif len(graph) > max_nodes:
+        words = ge.top_nodes(graph, max_nodes)
+    elif min_weight <= 1:
+        return graph
+    else:
+        words = graph.words
+    return ge.subgraph(graph, words, min_weight)
+
+
+def _evict_files(directory, suffix, max_files):
+    """目录中以 suffix 结尾的文件超过 max_files 个时，删除修改时间最早的"""
+    entries = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith(suffix):
+            try:
+                entries.append((entry.stat().st_mtime, entry.path))
+            except OSError:   # 已被其他线程删除
+                pass
+    if len(entries) <= max_files:
+        return
+    entries.sort()
+    for _, path in entries[:len(entries) - max_files]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def layout_dot(graph, engine, rankdir=None):
+    """只用于计算布局的 Digraph：单词为节点，边以权重为标签"""
+    import graphviz
+
+    dot = graphviz.Digraph(engine=engine)
+    if rankdir:
+        dot.attr(rankdir=rankdir)
+    for node in graph.words:
+        dot.node(node)
+    for u, v, w in graph.edges():
+        dot.edge(u, v, label=str(w))
+    return dot
+
+
+def _plain_tokens(line):
+    # 只有含空格等特殊字符的名字才会加引号，绝大多数行直接切分
+    return shlex.split(line) if '"' in line else line.split()
+
+
+class Layout:
+    """一次 Graphviz 布局的结果，坐标已换算为像素且 y 轴向下
+
+    节点 i（即 graph.words[i]）的中心为 (x[i], y[i])，默认尺寸为
+    w[i] × h[i]；第 k 条边从 src[k] 指向 dst[k]，其三次贝塞尔控制点为
+    pts[2 * pts_ptr[k]:2 * pts_ptr[k+1]]（x, y 交替），权重标签位于
+    (label_x[k], label_y[k])，没有标签时为 NaN。
+    """
+
+    FIELDS = ('x', 'y', 'w', 'h', 'src', 'dst', 'pts_ptr', 'pts', 'label_x', 'label_y')
+
+    def __init__(self, width, height, **arrays):
+        self.width = width
+        self.height = height
+        for name in self.FIELDS:
+            setattr(self, name, arrays[name])
+
+    def __len__(self):
+        return len(self.x)
+
+    def edge_points(self, k):
+        """第 k 条边的控制点坐标 [x0, y0, x1, y1, ...]"""
+        return self.pts[2 * self.pts_ptr[k]:2 * self.pts_ptr[k + 1]]
+
+    def save(self, path):
+        import numpy as np
+
+        np.savez(path, size=np.array([self.width, self.height]),
+                 **{name: getattr(self, name) for name in self.FIELDS})
+
+    @staticmethod
+    def load(path):
+        import numpy as np
+
+        with np.load(path) as data:
+            width, height = data['size'].tolist()
+            return Layout(width, height, **{name: data[name] for name in Layout.FIELDS})
+
+
+def parse_plain(graph, text):
+    """解析 Graphviz 的 plain 格式输出"""
+    import numpy as np
+
+    N = len(graph)
+    index = graph.index
+    x, y, w, h = (np.zeros(N) for _ in range(4))
+    src, dst, pts_ptr, pts, label_x, label_y = [], [], [0], [], [], []
+    height = width = 0.0
+    for line in text.splitlines():
+        tokens = _plain_tokens(line)
+        if not tokens:
+            continue
+        kind = tokens[0]
+        if kind == 'graph':
+            width, height = float(tokens[2]), float(tokens[3])
+        elif kind == 'node':
+            i = index[tokens[1]]
+            x[i], y[i], w[i], h[i] = map(float, tokens[2:6])
+        elif kind == 'edge':
+            src.append(index[tokens[1]])
+            dst.append(index[tokens[2]])
+            n = int(tokens[3])
+            pts.extend(map(float, tokens[4:4 + 2 * n]))
+            pts_ptr.append(pts_ptr[-1] + n)
+            rest = tokens[4 + 2 * n:]
+            # 末尾依次为 [label xl yl] style color
+            if len(rest) >= 5:
+                label_x.append(float(rest[1]))
+                label_y.append(float(rest[2]))
+            else:
+                label_x.append(float('nan'))
+                label_y.append(float('nan'))
+
+    # 英寸 -> 像素，并把 y 轴翻转为画布的向下方向
+    pts = np.array(pts, dtype=np.float64).reshape(-1, 2)
+    pts[:, 0] *= LAYOUT_DPI
+    pts[:, 1] = (height - pts[:, 1]) * LAYOUT_DPI
+    return Layout(width * LAYOUT_DPI, height * LAYOUT_DPI,
+                  x=x * LAYOUT_DPI, y=(height - y) * LAYOUT_DPI,
+                  w=w * LAYOUT_DPI, h=h * LAYOUT_DPI,
+                  src=np.array(src, dtype=np.int32), dst=np.array(dst, dtype=np.int32),
+                  pts_ptr=np.array(pts_ptr, dtype=np.int64), pts=pts.ravel(),
+                  label_x=np.array(label_x) * LAYOUT_DPI,
+                  label_y=(height - np.array(label_y)) * LAYOUT_DPI)
+
+
+def compute_layout(graph, engine, rankdir=None):
+    """调用 Graphviz 计算布局（不生成图片）"""
+    text = layout_dot(graph, engine, rankdir).pipe(format='plain', encoding='utf-8')
+    return parse_plain(graph, text)
+
+
+class LayoutCache:
+    """按 (图, 布局引擎) 缓存布局坐标，内存与磁盘（.npz）两级 LRU
+
+    只应由一个线程访问，界面中由 RenderWorker 的工作线程调用。
+    """
+
+    def __init__(self, cache_dir=None, max_entries=4, max_files=16):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_files = max_files
+        self.memory = OrderedDict()
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, graph, engine, rankdir=None, stale=None):
+        """返回图在该布局引擎下的布局，必要时调用 Graphviz 计算
+
+        stale 为 RenderWorker 传给任务的函数：缓存未命中且请求已经过期时
+        不再调用 Graphviz，直接返回 None。
+        """
+        key = hashlib.sha1(f"{graph.fingerprint()}\0{engine}\0{rankdir}".encode('utf-8')).hexdigest()
+        layout = self.memory.get(key)
+        if layout is not None:
+            self.memory.move_to_end(key)
+            return layout
+
+        path = os.path.join(self.cache_dir, key + ".npz") if self.cache_dir else None
+        if path is not None and os.path.exists(path):
+            layout = Layout.load(path)
+            os.utime(path)
+        elif stale is not None and stale():
+            return None
+        else:
+            layout = compute_layout(graph, engine, rankdir)
+            if path is not None:
+                layout.save(path)
+                _evict_files(self.cache_dir, ".npz", self.max_files)
+
+        self.memory[key] = layout
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+        return layout
+
+
+class GridIndex:
+    """矩形的均匀网格空间索引
+
+    boxes 为 M×4 数组 (x0, y0, x1, y1)。跨越不超过 max_span×max_span 个格子
+    的矩形登记在它覆盖的每个格子里，按格子编号排序后以 CSR 存储
+    （cell_ptr/items），同一行相邻格子的条目在 items 中连续；更大的矩形
+    （如横跨全图的长边）单独存放，查询时直接逐个比较。
+    """
+
+    def __init__(self, boxes, cell_size=None, max_span=4):
+        import numpy as np
+
+        self.boxes = boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        M = len(boxes)
+        if M:
+            self.x0, self.y0 = boxes[:, 0].min(), boxes[:, 1].min()
+            width = max(boxes[:, 2].max() - self.x0, 1.0)
+            height = max(boxes[:, 3].max() - self.y0, 1.0)
+        else:
+            self.x0 = self.y0 = 0.0
+            width = height = 1.0
+        if cell_size is None:
+            # 平均每个格子约一个矩形
+            cell_size = max(math.sqrt(width * height / max(M, 1)), 1.0)
+        self.cell_size = cell_size
+        self.nx = int(width // cell_size) + 1
+        self.ny = int(height // cell_size) + 1
+
+        cx0, cy0 = self._cell(boxes[:, 0], self.x0, self.nx), self._cell(boxes[:, 1], self.y0, self.ny)
+        cx1, cy1 = self._cell(boxes[:, 2], self.x0, self.nx), self._cell(boxes[:, 3], self.y0, self.ny)
+        wx, wy = cx1 - cx0 + 1, cy1 - cy0 + 1
+        small = (wx <= max_span) & (wy <= max_span)
+        self.large = np.flatnonzero(~small)
+
+        # 把每个小矩形展开到它覆盖的所有格子
+        ids = np.flatnonzero(small)
+        counts = (wx * wy)[ids]
+        rep = np.repeat(ids, counts)
+        local = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        cells = (cy0[rep] + local // wx[rep]) * self.nx + cx0[rep] + local % wx[rep]
+        order = np.argsort(cells, kind='stable')
+        self.items = rep[order]
+        self.cell_ptr = np.zeros(self.nx * self.ny + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=self.nx * self.ny), out=self.cell_ptr[1:])
+
+    def _cell(self, values, origin, n):
+        import numpy as np
+
+        return np.clip(((values - origin) // self.cell_size).astype(np.int64), 0, n - 1)
+
+    def query(self, x0, y0, x1, y1):
+        """与矩形 (x0, y0, x1, y1) 相交的条目编号（升序）"""
+        import numpy as np
+
+        cx0, cx1 = (int(np.clip((v - self.x0) // self.cell_size, 0, self.nx - 1)) for v in (x0, x1))
+        cy0, cy1 = (int(np.clip((v - self.y0) // self.cell_size, 0, self.ny - 1)) for v in (y0, y1))
+        parts = [self.items[self.cell_ptr[cy * self.nx + cx0]:self.cell_ptr[cy * self.nx + cx1 + 1]]
+                 for cy in range(cy0, cy1 + 1)]
+        parts.append(self.large)
+        candidates = np.unique(np.concatenate(parts))
+        b = self.boxes[candidates]
+        hit = (b[:, 0] <= x1) & (b[:, 2] >= x0) & (b[:, 1] <= y1) & (b[:, 3] >= y0)
+        return candidates[hit]
+
+
+def _node_boxes(layout):
+    """各节点默认尺寸的外接矩形，N×4"""
+    import numpy as np
+
+    half_w, half_h = layout.w / 2, layout.h / 2
+    return np.column_stack([layout.x - half_w, layout.y - half_h,
+                            layout.x + half_w, layout.y + half_h])
+
+
+def _pick_node(layout, node_index, x, y):
+    """布局坐标 (x, y) 落在哪个节点（椭圆）内，取中心最近的一个，没有时返回 None"""
+    best, best_d = None, 1.0
+    for i in node_index.query(x, y, x, y).tolist():
+        dx = (x - layout.x[i]) / max(layout.w[i] / 2, 1e-9)
+        dy = (y - layout.y[i]) / max(layout.h[i] / 2, 1e-9)
+        d = dx * dx + dy * dy
+        if d <= best_d:
+            best, best_d = i, d
+    return best
+
+
+def node_info(graph, word, pagerank=None):
+    """悬停提示的文字：出入度与 PageRank（graph 应为完整的图）"""
+    lines = [word, f"出度: {graph.out_degree(word)}  入度: {graph.in_degree(word)}"]
+    if pagerank and word in pagerank:
+        lines.append(f"PageRank: {pagerank[word]:.6f}")
+    return "\n".join(lines)
+
+
+def show_tooltip(canvas, x, y, text):
+    """在画布坐标 (x, y) 右下方显示提示框"""
+    canvas.delete("tooltip")
+    item = canvas.create_text(x + 12, y + 12, text=text, anchor='nw', tags=("tooltip",))
+    x0, y0, x1, y1 = canvas.bbox(item)
+    rect = canvas.create_rectangle(x0 - 3, y0 - 2, x1 + 3, y1 + 2, fill="#ffffe0",
+                                   outline="gray", tags=("tooltip",))
+    canvas.tag_lower(rect, item)
+
+
+def hide_tooltip(canvas):
+    canvas.delete("tooltip")
+
+
+def _pr_color(normalized):
+    # PR 值越大颜色越深（白 -> 青）
+    return "#%02xffff" % int(255 * (1 - normalized))
+
+
+class LayoutView:
+    """在 tk.Canvas 上按固定布局绘制图
+
+    draw() 为每个节点和每条边各创建一次图元；之后高亮路径或叠加 PageRank
+    只调用 style() 修改这些图元的颜色、大小和文字，不再重新布局。
+    """
+
+    HIGHLIGHT_COLORS = ['#FF0000', '#0000FF', '#00FF00', '#FFA500', '#800080']
+
+    def __init__(self, canvas, graph, layout):
+        self.canvas = canvas
+        self.graph = graph
+        self.layout = layout
+        self.node_items = []        # 节点编号 -> (椭圆, 文字)
+        self.edge_items = {}        # (u, v) -> 线条
+        self.styled_nodes = False
+        self.styled_edges = []
+        self.node_index = GridIndex(_node_boxes(layout))
+
+    def node_at(self, x, y):
+        """画布坐标 (x, y) 处的单词，不在节点上时返回 None"""
+        i = _pick_node(self.layout, self.node_index, x, y)
+        return None if i is None else self.graph.words[i]
+
+    def draw(self):
+        canvas, layout = self.canvas, self.layout
+        canvas.delete("all")
+        weights = self._edge_weights()
+        for k, (u, v) in enumerate(zip(layout.src.tolist(), layout.dst.tolist())):
+            self.edge_items[(u, v)] = canvas.create_line(
+                *layout.edge_points(k).tolist(), smooth='raw', arrow='last', tags=("edge",))
+            if not math.isnan(layout.label_x[k]):
+                canvas.create_text(layout.label_x[k], layout.label_y[k],
+                                   text=str(weights[k]), tags=("label",))
+        for i, word in enumerate(self.graph.words):
+            oval = canvas.create_oval(*self._node_box(i, layout.w[i], layout.h[i]),
+                                      fill="white", tags=("node",))
+            text = canvas.create_text(layout.x[i], layout.y[i], text=word, tags=("node",))
+            self.node_items.append((oval, text))
+        canvas.configure(scrollregion=(0, 0, layout.width, layout.height))
+
+    def _edge_weights(self):
+        graph, layout = self.graph, self.layout
+        return [graph.out_w[graph.edge_slot(u, v)]
+                for u, v in zip(layout.src.tolist(), layout.dst.tolist())]
+
+    def _node_box(self, i, w, h):
+        x, y = self.layout.x[i], self.layout.y[i]
+        return x - w / 2, y - h / 2, x + w / 2, y + h / 2
+
+    def style(self, pagerank=None, paths=None):
+        """按 PageRank 调整节点大小与颜色，并用不同颜色高亮各条路径"""
+        canvas, layout = self.canvas, self.layout
+
+        if pagerank is not None:
+            max_pr = max(pagerank.values()) or 1  # 防止除零
+            for i, word in enumerate(self.graph.words):
+                pr = pagerank[word]
+                normalized = pr / max_pr
+                oval, text = self.node_items[i]
+                box = self._node_box(i, (0.5 + normalized * 2) * LAYOUT_DPI,
+                                     (0.3 + normalized * 1) * LAYOUT_DPI)
+                canvas.coords(oval, *box)
+                canvas.itemconfigure(oval, fill=_pr_color(normalized))
+                canvas.itemconfigure(text, text=f"{word}\n{pr:.3f}")
+            self.styled_nodes = True
+        elif self.styled_nodes:
+            for i, word in enumerate(self.graph.words):
+                oval, text = self.node_items[i]
+                canvas.coords(oval, *self._node_box(i, layout.w[i], layout.h[i]))
+                canvas.itemconfigure(oval, fill="white")
+                canvas.itemconfigure(text, text=word)
+            self.styled_nodes = False
+
+        for line in self.styled_edges:
+            canvas.itemconfigure(line, fill="black", width=1)
+        self.styled_edges = []
+        index = self.graph.index
+        for path_idx, path in enumerate(paths or ()):
+            color = self.HIGHLIGHT_COLORS[path_idx % len(self.HIGHLIGHT_COLORS)]
+            for a, b in zip(path, path[1:]):
+                # 只绘制了部分节点时，路径上的边可能不在画布上
+                line = self.edge_items.get((index.get(a), index.get(b)))
+                if line is not None:
+                    canvas.itemconfigure(line, fill=color, width=2.5)
+                    canvas.tag_raise(line)
+                    self.styled_edges.append(line)
+        canvas.tag_raise("node")
+
+
+class ViewportView:
+    """可平移缩放的画布视图
+
+    屏幕坐标 = 布局坐标 × scale + offset。每次重绘只为视口内的节点和边
+    创建图元（由 GridIndex 查出），缩放后按新的比例重新生成图元，线条和
+    文字始终清晰；拖动时先整体移动已有图元，停下后再补画新露出的部分。
+    """
+
+    REDRAW_DELAY = 40      # 平移、缩放停止多少毫秒后重绘
+    LABEL_SCALE = 0.5      # 比例低于此值时不显示文字
+
+    def __init__(self, canvas, graph, layout, colors=None):
+        import numpy as np
+
+        self.canvas = canvas
+        self.graph = graph
+        self.layout = layout
+        self.colors = colors or LayoutView.HIGHLIGHT_COLORS
+        self.scale = 1.0
+        self.offset_x = self.offset_y = 0.0
+        self.pagerank = None
+        self.edge_colors = {}
+        self.after_id = None
+
+        self.node_index = GridIndex(_node_boxes(layout))
+        pts = layout.pts.reshape(-1, 2)
+        starts = layout.pts_ptr[:-1]
+        if len(starts):
+            edge_boxes = np.column_stack([
+                np.minimum.reduceat(pts[:, 0], starts), np.minimum.reduceat(pts[:, 1], starts),
+                np.maximum.reduceat(pts[:, 0], starts), np.maximum.reduceat(pts[:, 1], starts)])
+        else:
+            edge_boxes = np.zeros((0, 4))
+        self.edge_index = GridIndex(edge_boxes)
+        weights = [graph.out_w[graph.edge_slot(u, v)]
+                   for u, v in zip(layout.src.tolist(), layout.dst.tolist())]
+        self.edge_weights = weights
+
+    def _canvas_size(self):
+        width, height = self.canvas.winfo_width(), self.canvas.winfo_height()
+        if width <= 1:   # 尚未显示时使用配置的尺寸
+            width, height = int(self.canvas['width']), int(self.canvas['height'])
+        return width, height
+
+    def fit(self):
+        """缩放到整张图恰好放进画布"""
+        width, height = self._canvas_size()
+        layout = self.layout
+        self.scale = min(width / max(layout.width, 1), height / max(layout.height, 1), 1.0)
+        self.offset_x = (width - layout.width * self.scale) / 2
+        self.offset_y = (height - layout.height * self.scale) / 2
+        self.redraw()
+
+    def style(self, pagerank=None, paths=None):
+        """设置 PageRank 叠加与高亮路径并重绘"""
+        self.pagerank = pagerank
+        index = self.graph.index
+        self.edge_colors = {}
+        for path_idx, path in enumerate(paths or ()):
+            color = self.colors[path_idx % len(self.colors)]
+            for a, b in zip(path, path[1:]):
+                self.edge_colors.setdefault((index.get(a), index.get(b)), color)
+        self.redraw()
+
+    def node_at(self, x, y):
+        """屏幕坐标 (x, y) 处的单词，不在节点上时返回 None"""
+        i = _pick_node(self.layout, self.node_index,
+                       (x - self.offset_x) / self.scale, (y - self.offset_y) / self.scale)
+        return None if i is None else self.graph.words[i]
+
+    def visible_rect(self):
+        """视口在布局坐标中的范围"""
+        width, height = self._canvas_size()
+        s = self.scale
+        return (-self.offset_x / s, -self.offset_y / s,
+                (width - self.offset_x) / s, (height - self.offset_y) / s)
+
+    def redraw(self):
+        self.after_id = None
+        canvas, layout, s = self.canvas, self.layout, self.scale
+        ox, oy = self.offset_x, self.offset_y
+        canvas.delete("all")
+        rect = self.visible_rect()
+        show_text = s >= self.LABEL_SCALE
+        font = ("Times", max(int(10 * s), 1))
+
+        src, dst = layout.src, layout.dst
+        for k in self.edge_index.query(*rect).tolist():
+            u, v = int(src[k]), int(dst[k])
+            color = self.edge_colors.get((u, v))
+            coords = layout.edge_points(k).reshape(-1, 2) * s + (ox, oy)
+            canvas.create_line(*coords.ravel().tolist(), smooth='raw', arrow='last',
+                               fill=color or "black", width=2.5 if color else 1,
+                               arrowshape=(8 * s, 10 * s, 3 * s), tags=("edge",))
+            if show_text and not math.isnan(layout.label_x[k]):
+                canvas.create_text(layout.label_x[k] * s + ox, layout.label_y[k] * s + oy,
+                                   text=str(self.edge_weights[k]), font=font, tags=("label",))
+
+        max_pr = (max(self.pagerank.values()) or 1) if self.pagerank else 1  # 防止除零
+        words = self.graph.words
+        for i in self.node_index.query(*rect).tolist():
+            word = words[i]
+            w, h, fill, text = layout.w[i], layout.h[i], "white", word
+            if self.pagerank:
+                pr = self.pagerank[word]
+                normalized = pr / max_pr
+                w, h = (0.5 + normalized * 2) * LAYOUT_DPI, (0.3 + normalized * 1) * LAYOUT_DPI
+                fill, text = _pr_color(normalized), f"{word}\n{pr:.3f}"
+            x, y = layout.x[i] * s + ox, layout.y[i] * s + oy
+            canvas.create_oval(x - w * s / 2, y - h * s / 2, x + w * s / 2, y + h * s / 2,
+                               fill=fill, tags=("node",))
+            if show_text:
+                canvas.create_text(x, y, text=text, font=font, tags=("node",))
+
+    def clear(self):
+        """换图时清空画布并取消尚未执行的重绘"""
+        if self.after_id is not None:
+            self.canvas.after_cancel(self.after_id)
+            self.after_id = None
+        self.canvas.delete("all")
+
+    def schedule_redraw(self):
+        if self.after_id is not None:
+            self.canvas.after_cancel(self.after_id)
+        self.after_id = self.canvas.after(self.REDRAW_DELAY, self.redraw)
+
+    def pan(self, dx, dy):
+        self.offset_x += dx
+        self.offset_y += dy
+        self.canvas.move("all", dx, dy)
+        self.schedule_redraw()
+
+    def zoom(self, factor, x, y):
+        """以屏幕坐标 (x, y) 为中心缩放"""
+        self.scale *= factor
+        self.offset_x = x - (x - self.offset_x) * factor
+        self.offset_y = y - (y - self.offset_y) * factor
+        # 先拉伸已有图元作为预览，停下后按新比例重新生成
+        self.canvas.scale("all", x, y, factor, factor)
+        self.schedule_redraw()
+
+
+class RenderWorker:
+    """后台渲染线程
+
+    submit(job, on_done) 把 job(stale) 放到工作线程执行，结果通过
+    root.after 交回 Tk 主线程调用 on_done(result)。同一时刻只保留最新的
+    一个请求：尚未开始的请求被新请求直接替换，连续刷新只渲染最后一次；
+    已经开始的请求过期后结果被丢弃，job 也可以调用 stale() 提前结束。
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.cond = threading.Condition()
+        self.request = None
+        self.generation = 0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, job, on_done, on_error=None):
+        """提交新请求，之前的请求全部作废"""
+        with self.cond:
+            self.generation += 1
+            self.request = (self.generation, job, on_done, on_error)
+            self.cond.notify()
+            return self.generation
+
+    def cancel(self):
+        """作废所有请求"""
+        with self.cond:
+            self.generation += 1
+            self.request = None
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.request is None:
+                    self.cond.wait()
+                generation, job, on_done, on_error = self.request
+                self.request = None
+
+            def stale(generation=generation):
+                return generation != self.generation
+
+            try:
+                result = job(stale)
+            except Exception as e:
+                if not stale() and on_error is not None:
+                    self.root.after(0, self._deliver, generation, on_error, e)
+                continue
+            if not stale():
+                self.root.after(0, self._deliver, generation, on_done, result)
+
+    def _deliver(self, generation, callback, value):
+        # 结果排队等待主线程期间可能又提交了新请求
+        if generation == self.generation:
+            callback(value)